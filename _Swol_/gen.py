@@ -1,37 +1,95 @@
+import argparse
 import random
+from datetime import date, timedelta
 from pathlib import Path
 
 lifts_dir = Path("Lifts")
 workouts_dir = Path("Workouts")
+usr_dir = Path("Usr")
 
 lifts = ["bench press", "bicep curls", "squats", "deadlifts", "lunges", "lateral raises", "skull crushers"]
 workouts = ["Workout 1", "Workout 2", "Workout 3", "Workout 4"]
 
 sample_size = 3
 
-def gen_lifts():
+# Word lists for making up large lift catalogs
+modifiers = ["incline", "decline", "seated", "standing", "single arm", "close grip", "wide grip",
+             "paused", "tempo", "deficit", "banded", "reverse", "front", "overhead", "split"]
+equipment = ["barbell", "dumbbell", "cable", "machine", "kettlebell", "smith", "trap bar", "band"]
+movements = ["bench press", "curl", "squat", "deadlift", "lunge", "raise", "row", "press",
+             "extension", "fly", "pulldown", "shrug", "pullover", "kickback", "thrust"]
+
+
+def make_lift_names(count):
+    """The sample lifts, then made-up but realistic names until count is reached"""
+    names = lifts[:count]
+    seen = set(names)
+    while len(names) < count:
+        name = f"{random.choice(modifiers)} {random.choice(equipment)} {random.choice(movements)}"
+        if name in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def gen_lifts(lifts_dir=lifts_dir, names=lifts):
     lifts_dir.mkdir(parents=True, exist_ok=True)
-    for lift in lifts:
+    for lift in names:
         lift = lift + ".txt"
         fName = lifts_dir / lift
         fName.touch()
 
-def gen_workout():
+def gen_workout(workouts_dir=workouts_dir, names=workouts, lift_names=lifts):
     workouts_dir.mkdir(parents=True, exist_ok=True)
 
-    for workout in workouts:
-        ran_lifts = random.sample(lifts, sample_size)
+    for workout in names:
+        ran_lifts = random.sample(lift_names, min(sample_size, len(lift_names)))
         ran_lifts = "\n".join(ran_lifts).strip()
         workout = workout + ".txt"
         f_name = workouts_dir / workout
         with open(f_name, 'w') as f:
             f.write(ran_lifts)
 
+def gen_weights(usr_dir=usr_dir, count=0, name="Bench User", goal="180"):
+    """A profile with count daily weigh-ins, ending today when they fit after year 1000"""
+    usr_dir.mkdir(parents=True, exist_ok=True)
+    (usr_dir / "name.txt").write_text(name)
+    (usr_dir / "goal.txt").write_text(goal)
+
+    # Past about 375k entries the dates would start before year 1000, so start there instead
+    start = date.fromordinal(max(date(1000, 1, 1).toordinal(), date.today().toordinal() - count))
+    weight = 220.0
+    entries = []
+    for i in range(count):
+        day = start + timedelta(days=i)
+        weight = min(400.0, max(100.0, weight + random.uniform(-0.8, 0.7)))
+        # strftime does not zero-pad years before 1000
+        entries.append(f"{weight:.1f}\n{day.month:02d}-{day.day:02d}-{day.year:04d}")
+    with open(usr_dir / "weight.txt", 'w') as f:
+        f.write("\n".join(entries))
+
+def generate(root=Path("."), weights=0, lift_count=len(lifts), workout_count=len(workouts), seed=None):
+    """Build a whole _Swol_ tree under root"""
+    if seed is not None:
+        random.seed(seed)
+    lift_names = make_lift_names(lift_count)
+    workout_names = workouts[:workout_count] + [f"Workout {i + 1}" for i in range(len(workouts), workout_count)]
+    gen_lifts(root / lifts_dir, lift_names)
+    gen_workout(root / workouts_dir, workout_names, lift_names)
+    if weights:
+        gen_weights(root / usr_dir, weights)
+
 def main():
-    gen_lifts()
-    gen_workout()
+    parser = argparse.ArgumentParser(description="Generate sample or benchmark-sized data")
+    parser.add_argument("--out", default=".", help="directory to fill (default: here)")
+    parser.add_argument("--weights", type=int, default=0, help="daily weight entries to write")
+    parser.add_argument("--lifts", type=int, default=len(lifts))
+    parser.add_argument("--workouts", type=int, default=len(workouts))
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    generate(Path(args.out), args.weights, args.lifts, args.workouts, args.seed)
 
 if __name__ == "__main__":
     main()
 
-
@@ -0,0 +1,161 @@
+from datetime import date
+from typing import Optional, Tuple
+import math
+import numpy as np
+import config
+from helpers import parse_date_ordinal
+from history import WeightHistory
+
+
+class WeightAnalytics:
+    """Trend statistics over the weight history held as NumPy vectors.
+
+    Dates are stored as day ordinals (int64) and weights as float64, both
+    kept in date order. They are copied once from a WeightHistory;
+    ``append`` adds a point in place and updates the regression sums
+    without rescanning. The latest EMA is carried forward by appends at the
+    end and recomputed only when it is read after a backfill.
+    """
+
+    def __init__(self, history: WeightHistory, ema_span: int = config.EMA_SPAN) -> None:
+        days, weights = history.to_numpy()
+        self._n = len(history)
+        capacity = max(16, self._n * 2)
+        self._days = np.zeros(capacity, dtype=np.int64)
+        self._weights = np.zeros(capacity, dtype=np.float64)
+        self._days[:self._n] = days
+        self._weights[:self._n] = weights
+
+        # Regression sums use days relative to the first point to keep them small
+        self._origin = int(self._days[0]) if self._n else 0
+        x = (self.days - self._origin).astype(np.float64)
+        y = self.weights
+        self._sx = float(x.sum())
+        self._sy = float(y.sum())
+        self._sxx = float((x * x).sum())
+        self._sxy = float((x * y).sum())
+
+        self._alpha = 2.0 / (ema_span + 1)
+        # None until first read, and again after a backfill
+        self._ema_last: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def days(self) -> np.ndarray:
+        """Day ordinals in date order"""
+        return self._days[:self._n]
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Weights matching ``days``"""
+        return self._weights[:self._n]
+
+    def append(self, weight: str, date_str: str) -> None:
+        """Add one point, keeping the vectors in date order"""
+        day, value = parse_date_ordinal(date_str), float(weight)
+        if self._n == len(self._days):
+            self._days = np.resize(self._days, self._n * 2)
+            self._weights = np.resize(self._weights, self._n * 2)
+
+        pos = int(np.searchsorted(self.days, day, side="right"))
+        at_end = pos == self._n
+        if not at_end:
+            self._days[pos + 1:self._n + 1] = self._days[pos:self._n]
+            self._weights[pos + 1:self._n + 1] = self._weights[pos:self._n]
+        self._days[pos] = day
+        self._weights[pos] = value
+        if self._n == 0:
+            self._origin = day
+        self._n += 1
+
+        x = float(day - self._origin)
+        self._sx += x
+        self._sy += value
+        self._sxx += x * x
+        self._sxy += x * value
+
+        if self._n == 1:
+            self._ema_last = value
+        elif at_end and self._ema_last is not None:
+            self._ema_last = self._alpha * value + (1 - self._alpha) * self._ema_last
+        else:
+            # A backfilled point changes every EMA value after it
+            self._ema_last = None
+
+    def rolling_average(self, window_days: int = config.ROLLING_WINDOW_DAYS) -> np.ndarray:
+        """Mean weight over the trailing ``window_days`` days at each point"""
+        if not self._n:
+            return np.zeros(0)
+        csum = np.concatenate(([0.0], np.cumsum(self.weights)))
+        start = np.searchsorted(self.days, self.days - window_days, side="right")
+        end = np.arange(1, self._n + 1)
+        return (csum[end] - csum[start]) / (end - start)
+
+    def ema(self) -> np.ndarray:
+        """Exponential moving average at each point"""
+        weights = self.weights
+        decay = 1 - self._alpha
+        if not self._n or decay <= 0:
+            return weights.copy()
+        # Each block is solved in closed form from the value before it:
+        # ema[k] = decay**(k+1) * (before + alpha * sum(w[j] / decay**(j+1) for j <= k)).
+        # Blocks are kept short enough that decay**-k stays far from overflowing.
+        block = max(1, int(200 / -math.log(decay)))
+        out = np.empty(self._n)
+        before = float(weights[0])
+        for start in range(0, self._n, block):
+            chunk = weights[start:start + block]
+            powers = decay ** np.arange(1, len(chunk) + 1)
+            out[start:start + len(chunk)] = powers * (before + self._alpha * np.cumsum(chunk / powers))
+            before = float(out[start + len(chunk) - 1])
+        return out
+
+    @property
+    def latest_ema(self) -> Optional[float]:
+        """Current EMA, recomputed only if a backfill invalidated it"""
+        if self._ema_last is None and self._n:
+            self._ema_last = float(self.ema()[-1])
+        return self._ema_last
+
+    def trend(self) -> Optional[Tuple[float, float]]:
+        """Least-squares (slope per day, intercept) against day ordinals"""
+        n = self._n
+        denom = n * self._sxx - self._sx * self._sx
+        if n < 2 or denom == 0:
+            return None
+        slope = (n * self._sxy - self._sx * self._sy) / denom
+        intercept = (self._sy - slope * self._sx) / n - slope * self._origin
+        return slope, intercept
+
+    def weekly_rate(self) -> float:
+        """Trend slope in lbs per week"""
+        fit = self.trend()
+        return fit[0] * 7 if fit else 0.0
+
+    def weekly_deltas(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Start day of each logged week and the change from the previous week.
+
+        Each week is represented by its last weigh-in.
+        """
+        if self._n < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        # Ordinal 1 is a Monday, so weeks run Monday to Sunday
+        weeks = (self.days - 1) // 7
+        last_in_week = np.flatnonzero(np.diff(weeks, append=weeks[-1] + 1))
+        week_weights = self.weights[last_in_week]
+        return weeks[last_in_week][1:] * 7 + 1, np.diff(week_weights)
+
+    def projected_goal_date(self, target: float) -> Optional[date]:
+        """Date the trend line reaches ``target``, or None if it never will"""
+        fit = self.trend()
+        if fit is None or not self._n:
+            return None
+        slope, intercept = fit
+        last_day = int(self.days[-1])
+        current = slope * last_day + intercept
+        if slope == 0 or (target - current) / slope < 0:
+            return None
+        day = math.ceil((target - intercept) / slope)
+        return date.fromordinal(max(day, last_day))
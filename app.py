@@ -1,21 +1,27 @@
-from textual.app import App, ComposeResult
+from textual import work
+from textual.app import App
 from textual.binding import Binding
-from textual.theme import Theme
+from textual.message import Message
 from textual.screen import Screen
-from textual.widgets import Button, Label, Input, ListView, ListItem, Static, option_list
-from textual.containers import Vertical, Horizontal, VerticalScroll
-from textual import fuzzy
+from textual.widgets import Button, Label, Input, Select
+from textual.containers import Vertical
 from user import UsrData
+from profiles import has_named_profiles, list_profiles, validate_profile_name
 from datetime import date
+from typing import Optional
 import config
-from createWorkouts import CreateWorkouts
-from updateWeight import UpdateWeight
+import instrument
+from writequeue import status_reporter
+
+# Secondary screens (updateWeight, logLift, createWorkouts, workoutBrowser,
+# startWorkout) are imported when first opened so they stay off the startup path.
 
 
 class Login(Screen):
-    def __init__(self, usr_info: UsrData):
+    def __init__(self, usr_info: Optional[UsrData]):
         super().__init__()
         self.usr_info = usr_info
+        self.temp_profile: str = ""
         self.temp_name: str = ""
         self.temp_weight: str = ""
         self.temp_target: str = ""
@@ -23,6 +29,9 @@ class Login(Screen):
     def compose(self):
         with Vertical():
             yield Label("🏋️ Fitness Tracker Login")
+            profiles = list_profiles(self.app.db_dir)  # pyright: ignore[reportAttributeAccessIssue]
+            yield Select([(p, p) for p in profiles], prompt="Choose a profile", id="profile_select")
+            yield Input(placeholder="Or name a new profile (optional): ", id="profile_input")
             yield Input(placeholder="Enter your name here: ", id="name_input")
             yield Input(placeholder="Enter your weight here: ", id="weight_input", type="number")
             yield Input(placeholder="Enter your target weight here: ", id="target_input", type="number")
@@ -34,37 +43,78 @@ class Login(Screen):
         input_widget = event.input
         value = event.value
         
-        if input_widget.id == "name_input":
+        if input_widget.id == "profile_input":
+            self.temp_profile = value
+        elif input_widget.id == "name_input":
             self.temp_name = value
         elif input_widget.id == "weight_input":
             self.temp_weight = value
         elif input_widget.id == "target_input":
             self.temp_target = value
 
+    def on_select_changed(self, event: Select.Changed):
+        """Open an existing profile, skipping the form if it is already set up"""
+        if event.value == Select.BLANK:
+            return
+        self.usr_info = self.app.switch_profile(str(event.value))  # pyright: ignore[reportAttributeAccessIssue]
+        if self.usr_info.need_login():
+            self.query_one("#status", Label).update(f"Set up profile '{event.value}' below")
+            return
+        self.usr_info.set_starting_vals()
+        self.app.pop_screen()
+        self.app.push_screen(MainScreen(self.usr_info))
+
     def on_button_pressed(self, event: Button.Pressed):
         if event.button.id == "submit":
             status_label = self.query_one("#status")
-            
-            success, msg = self.usr_info.write_usr_name(self.temp_name)
-            if not success:
-                status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
-                return
-            
-            success, msg = self.usr_info.write_usr_weight_first(self.temp_weight)
+
+            profile = self.temp_profile.strip()
+            if profile:
+                success, msg = validate_profile_name(profile)
+                if not success:
+                    status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
+                    return
+            # Check the whole form first so a bad entry never leaves a new profile half made
+            success, msg = UsrData.validate_login(self.temp_name, self.temp_weight, self.temp_target)
             if not success:
                 status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
                 return
-            
-            success, msg = self.usr_info.write_usr_target_weight(self.temp_target)
-            if not success:
-                status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
+            if profile or self.usr_info is None:
+                self.usr_info = self.app.switch_profile(profile or config.DEFAULT_PROFILE)  # pyright: ignore[reportAttributeAccessIssue]
+            if not self.usr_info.need_login():
+                # Submitting again would reset its weight history
+                status_label.update(config.MSG_PROFILE_EXISTS.format(profile=self.usr_info.profile))  # pyright: ignore[reportAttributeAccessIssue]
                 return
+
+            report = status_reporter(self)
+            with self.usr_info.batch():
+                success, msg = self.usr_info.write_usr_name(self.temp_name, report)
+                if not success:
+                    status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
+                    return
+                
+                success, msg = self.usr_info.write_usr_weight_first(self.temp_weight, report)
+                if not success:
+                    status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
+                    return
+                
+                success, msg = self.usr_info.write_usr_target_weight(self.temp_target, report)
+                if not success:
+                    status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
+                    return
             
             status_label.update(config.MSG_LOGIN_SUCCESS)  # pyright: ignore[reportAttributeAccessIssue]
             self.app.pop_screen()
             self.app.push_screen(MainScreen(self.usr_info))
 
 class MainScreen(Screen):
+    class TrendReady(Message):
+        """Posted by the trend worker once the weight history has been fitted"""
+        def __init__(self, rate: Optional[float], projected: Optional[date]) -> None:
+            super().__init__()
+            self.rate = rate
+            self.projected = projected
+
     def __init__(self, usr_info: UsrData):
         super().__init__()
         self.usr_info = usr_info
@@ -82,25 +132,65 @@ class MainScreen(Screen):
                 yield Label(f"Goal: Gain {abs(weight_diff):.1f} lbs")
             else:
                 yield Label("🎉 You're at your target weight!")
+
+            # Filled in by _trend_worker once the screen is up
+            for label_id in ("trend", "projected"):
+                label = Label("", id=label_id)
+                label.display = False
+                yield label
+            yield from self._session_labels()
             
             #yield Button("Log Workout", id="workout")
             yield Button("Update Weight", id="update_weight")
             yield Button("Add Lift", id="add_lift")
             yield Button(label="Add Workout", id="add_workout")
+            yield Button("Saved Workouts", id="saved_workouts")
             yield Label("", id="status")
 
 
+    def on_mount(self):
+        self._trend_worker()
+
+    @work(thread=True, exclusive=True, group="trend")
+    def _trend_worker(self) -> None:
+        """Fit the full weight history off the event loop so it never delays the screen"""
+        rate, projected = self.usr_info.get_weight_trend()
+        self.post_message(self.TrendReady(rate, projected))
+
+    def on_main_screen_trend_ready(self, message: TrendReady) -> None:
+        if message.rate is not None:
+            trend = self.query_one("#trend", Label)
+            trend.update(f"Trend: {message.rate:+.1f} lbs/week")
+            trend.display = True
+        if message.projected is not None:
+            projected = self.query_one("#projected", Label)
+            projected.update(f"Projected goal date: {message.projected.strftime(config.DATE_FORMAT)}")
+            projected.display = True
+
+    def _session_labels(self):
+        rollups = self.usr_info.get_rollups()
+        today = date.today()
+        for period, totals in (("This week", rollups.week(today)), ("This month", rollups.month(today))):
+            if totals.sessions:
+                plural = "" if totals.sessions == 1 else "s"
+                yield Label(f"{period}: {totals.sessions} workout{plural}, "
+                            f"{totals.minutes:.0f} min, {totals.volume:,.0f} lbs")
+
     def on_button_pressed(self, event: Button.Pressed):
         if event.button.id == "update_weight":
+            from updateWeight import UpdateWeight
             self.app.push_screen(UpdateWeight(self.usr_info))
         elif event.button.id == "add_lift":
-            status_label = self.query_one("#status")
-            status_label.update("Add Lift Not implimented yet")  # pyright: ignore[reportAttributeAccessIssue]
-            #self.app.push_screen()
+            from logLift import LogLift
+            self.app.push_screen(LogLift(self.usr_info))
         elif event.button.id == "add_workout":
             #status_label = self.query_one("#status")
             #status_label.update("Add Workout not implimented yet")  # pyright: ignore[reportAttributeAccessIssue]
+            from createWorkouts import CreateWorkouts
             self.app.push_screen(CreateWorkouts(self.usr_info))
+        elif event.button.id == "saved_workouts":
+            from workoutBrowser import WorkoutBrowser
+            self.app.push_screen(WorkoutBrowser(self.usr_info))
 
 
 
@@ -108,17 +198,62 @@ class MainScreen(Screen):
 
 
 class MyApp(App):
-    def __init__(self):
+    BINDINGS = [Binding("f12", "toggle_debug_overlay", "Debug counters", show=False)]
+
+    def __init__(self, profile: Optional[str] = None, db_dir: str = config.DB_DIR):
         super().__init__()
-        self.usr_info = UsrData()
+        self.db_dir = db_dir
+        # Without an explicit profile, let the user pick once there is more than one.
+        # Nothing is opened until then, so an unchosen profile is never created or compacted.
+        self.pick_profile = profile is None and has_named_profiles(db_dir)
+        self.usr_info: Optional[UsrData] = None
+        if not self.pick_profile:
+            self.usr_info = UsrData(db_dir, profile=profile or config.DEFAULT_PROFILE,
+                                    write_behind=config.WRITE_BEHIND)
+
+    def switch_profile(self, profile: str) -> UsrData:
+        """Close the current profile, if any, and open another one"""
+        if self.usr_info is None or profile != self.usr_info.profile:
+            if self.usr_info is not None:
+                self.usr_info.close()
+            self.usr_info = UsrData(self.db_dir, profile=profile, write_behind=config.WRITE_BEHIND)
+            self._compact_worker()
+        return self.usr_info
+
+    def _compact_worker(self):
+        """Snapshot the current profile's logs in the background"""
+        # Bound to this profile's UsrData: a run for a profile that has since
+        # been closed stops early. Safe to abandon at exit, since a snapshot
+        # only replaces the old one once verified.
+        self.run_worker(self.usr_info.compact, thread=True, group="compact", exit_on_error=False)  # pyright: ignore[reportOptionalMemberAccess]
 
     def on_mount(self):
         self.theme = "tokyo-night"
         self.theme = "nord"
+        if self.usr_info is None:
+            # switch_profile opens and compacts the one the user picks
+            self.push_screen(Login(None))
+            return
         if self.usr_info.need_login():
             self.push_screen(Login(self.usr_info))
         else:
             self.usr_info.set_starting_vals()
             self.push_screen(MainScreen(self.usr_info))
+        self._compact_worker()
+
+    def action_toggle_debug_overlay(self):
+        """Show or hide live counters; only available with --trace"""
+        if not instrument.enabled:
+            return
+        from debugOverlay import DebugOverlay
+        overlays = self.screen.query(DebugOverlay)
+        if overlays:
+            overlays.remove()
+        else:
+            self.screen.mount(DebugOverlay())
+
+    def on_unmount(self):
+        if self.usr_info is not None:
+            self.usr_info.close()
 
 
@@ -0,0 +1,176 @@
+"""Scaling benchmarks for the data layer and the lift search.
+
+    python bench.py --sizes 1000,10000,100000 > results.jsonl
+
+Each size N gets a fresh data directory with N weight entries, N // 10
+lifts and N // 100 workouts, so N = 1000000 is 1M weights, 100k lifts and
+10k workouts. Every benchmark prints one JSON object per line; diff the
+files from two releases to spot regressions.
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import config
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Typed one key at a time, as in the CreateWorkouts search box
+SEARCH_QUERIES = ["bench press", "curl", "dumbbell row"]
+
+
+def _load_gen():
+    """The sample data generator, which lives in the data directory"""
+    spec = importlib.util.spec_from_file_location("gen", Path(__file__).parent / config.DB_DIR / "gen.py")
+    gen = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gen)  # pyright: ignore[reportOptionalMemberAccess]
+    return gen
+
+
+def commit_id() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=Path(__file__).parent, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _time_ms(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(name: str, size: int, samples: List[float]) -> Dict:
+    """One result record for a list of timings in milliseconds"""
+    samples = sorted(samples)
+    return {
+        "bench": name,
+        "size": size,
+        "runs": len(samples),
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(_percentile(samples, 95), 4),
+        "p99_ms": round(_percentile(samples, 99), 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def build_dataset(root: Path, size: int, seed: int = 0) -> None:
+    """Fill root with a data directory for the given size"""
+    gen = _load_gen()
+    db_dir = root / config.DB_DIR
+    gen.generate(db_dir, weights=size, lift_count=max(10, size // 10),
+                 workout_count=max(4, size // 100), seed=seed)
+    if config.STORAGE_BACKEND == "sqlite":
+        from migrate import migrate
+        migrate(db_dir, db_dir / config.SQLITE_FILE)
+
+
+def run_size(root: Path, size: int, repeat: int) -> List[Dict]:
+    from user import UsrData
+    from search import LiftSearchIndex
+
+    db_dir = str(root / config.DB_DIR)
+    results: List[Dict] = []
+
+    def cold(method: str) -> List[float]:
+        """Time one call on a new UsrData each run, as at startup"""
+        samples = []
+        for _ in range(repeat):
+            usr_info = UsrData(db_dir)
+            samples.append(_time_ms(getattr(usr_info, method)))
+            usr_info.close()
+        return samples
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        usr_info = UsrData(db_dir)
+        samples.append((time.perf_counter() - start) * 1000)
+        usr_info.close()
+    results.append(summarize("UsrData.__init__", size, samples))
+    results.append(summarize("get_weight", size, cold("get_weight")))
+    results.append(summarize("get_weight_history", size, cold("get_weight_history")))
+
+    usr_info = UsrData(db_dir)
+    # The first write loads the date index; time it on its own
+    day = date.today()
+    first = _time_ms(lambda: usr_info.write_usr_weight("200", day.strftime(config.DATE_FORMAT)))
+    results.append(summarize("write_usr_weight.first", size, [first]))
+    samples = []
+    for i in range(1, repeat + 1):
+        date_str = (day + timedelta(days=i)).strftime(config.DATE_FORMAT)
+        samples.append(_time_ms(lambda: usr_info.write_usr_weight("200", date_str)))
+    results.append(summarize("write_usr_weight", size, samples))
+
+    lifts = usr_info.lifts
+    samples = []
+    for i in range(repeat):
+        picked = random.sample(lifts, 3)
+        samples.append(_time_ms(lambda: usr_info.write_workout(f"Bench Workout {i}", picked)))
+    results.append(summarize("write_workout", size, samples))
+
+    build, keystrokes = [], []
+    for _ in range(repeat):
+        index: List[LiftSearchIndex] = []
+        build.append(_time_ms(lambda: index.append(LiftSearchIndex(usr_info.lifts))))
+        for query in SEARCH_QUERIES:
+            for end in range(1, len(query) + 1):
+                keystrokes.append(_time_ms(
+                    lambda: index[0].search(query[:end], config.SEARCH_RESULT_LIMIT)))
+    results.append(summarize("search.index_build", size, build))
+    results.append(summarize("search.keystroke", size, keystrokes))
+    usr_info.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time UsrData and lift search at several data sizes")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated weight-entry counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", choices=["files", "sqlite"], default=config.STORAGE_BACKEND)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="append results here instead of printing them")
+    args = parser.parse_args()
+
+    config.STORAGE_BACKEND = args.backend
+    random.seed(args.seed)
+    meta = {
+        "commit": commit_id(),
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "fsync": config.FSYNC_POLICY,
+    }
+
+    out = open(args.out, 'a') if args.out else sys.stdout
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            with tempfile.TemporaryDirectory() as tmp:
+                root = Path(tmp)
+                setup_ms = _time_ms(lambda: build_dataset(root, size, args.seed))
+                print(f"size {size}: dataset built in {setup_ms / 1000:.1f}s", file=sys.stderr)
+                for result in run_size(root, size, args.repeat):
+                    out.write(json.dumps({**result, **meta}) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+import config
+from durable import write_cache
+
+
+class Catalog:
+    """Lazy listing of the ``*.txt`` entries in one directory.
+
+    Nothing is read until ``names`` is first used. The listing is cached in
+    a manifest file keyed by the directory's mtime, so later startups cost
+    one stat and one small read instead of a stat per entry. Adding or
+    removing a file bumps the directory mtime, which triggers a rescan.
+    """
+
+    def __init__(self, dir_path: Path, manifest_path: Path) -> None:
+        self.dir_path = dir_path
+        self.manifest_path = manifest_path
+        self.version = 0
+        self._names: List[str] = []
+        self._mtime_ns: Optional[int] = None
+
+    @property
+    def names(self) -> List[str]:
+        """Names of all entries, refreshed if the directory has changed"""
+        mtime_ns = os.stat(self.dir_path).st_mtime_ns
+        if mtime_ns != self._mtime_ns:
+            self._refresh(mtime_ns)
+        return self._names
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def path(self, name: str) -> Path:
+        """File that stores the given entry"""
+        return self.dir_path / (name + ".txt")
+
+    def add(self, name: str) -> None:
+        """Record a file the app just wrote without rescanning the directory"""
+        names = self.names
+        if name not in names:
+            self._names = sorted(names + [name])
+            self.version += 1
+        self._mtime_ns = os.stat(self.dir_path).st_mtime_ns
+        self._write_manifest()
+
+    def _refresh(self, mtime_ns: int) -> None:
+        names = self._read_manifest(mtime_ns)
+        if names is None:
+            names = self._scan()
+            self._mtime_ns = mtime_ns
+            self._names = names
+            self._write_manifest()
+        else:
+            self._mtime_ns = mtime_ns
+            self._names = names
+        self.version += 1
+
+    def _scan(self) -> List[str]:
+        with os.scandir(self.dir_path) as entries:
+            return sorted(Path(entry.name).stem for entry in entries
+                          if entry.is_file() and not entry.name.endswith(config.TEMP_SUFFIX))
+
+    def _read_manifest(self, mtime_ns: int) -> Optional[List[str]]:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if manifest.get("mtime_ns") != mtime_ns:
+            return None
+        return manifest.get("names")
+
+    def _write_manifest(self) -> None:
+        write_cache(self.manifest_path, json.dumps({"mtime_ns": self._mtime_ns, "names": self._names}))
@@ -0,0 +1,153 @@
+"""Headless stats, exports and summaries, without loading the TUI.
+
+Usage: python cli.py stats [--profile NAME] [--json]
+       python cli.py summary [--profile NAME]
+       python cli.py export FILE [--format csv|jsonl]
+       python cli.py summary --all-profiles --db-dir A --db-dir B [--jobs N]
+
+Only the data layer (``user``, ``helpers``, ``config``, the profile
+helpers ``user`` already loads and the ``transfer`` exporter) is imported,
+so this starts without Textual or NumPy. With ``--all-profiles`` every profile in every
+``--db-dir`` is reported on in a pool of worker processes; ``export`` then
+takes a directory and writes one file per profile into it.
+"""
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import config
+from helpers import calculate_weight_change_rate
+from profiles import list_profiles, profile_path
+from transfer import FORMATS, export_weights
+from user import UsrData
+
+COMMANDS = ("stats", "summary", "export")
+
+# (command, db_dir, profile, export path, export format)
+Task = Tuple[str, str, str, Optional[str], str]
+
+
+def stats(usr_info: UsrData) -> Dict:
+    """Current weight, target and trend plus this week's and month's training"""
+    usr_info.set_starting_vals()
+    history = usr_info.get_weight_history()
+    rollups = usr_info.get_rollups()
+    today = date.today()
+    week, month = rollups.week(today), rollups.month(today)
+    return {
+        "name": usr_info.usr_name,
+        "weight": usr_info.usr_weight,
+        "target": usr_info.usr_target,
+        "difference": round(usr_info.get_weight_difference(), 2),
+        "entries": len(history),
+        "first_date": history[0][1].strftime(config.DATE_FORMAT) if len(history) else "",
+        "last_date": history[-1][1].strftime(config.DATE_FORMAT) if len(history) else "",
+        "weekly_rate": round(calculate_weight_change_rate(history), 3),
+        "week_sessions": week.sessions,
+        "week_volume": week.volume,
+        "month_sessions": month.sessions,
+        "month_volume": month.volume,
+    }
+
+
+def summary_line(report: Dict) -> str:
+    """One line of text for a stats report"""
+    label = f"{report['db_dir']}:{report['profile']}"
+    if report.get("error"):
+        return f"{label}: {report['error']}"
+    diff = report["difference"]
+    goal = ("at target" if diff == 0 else
+            f"{abs(diff):.1f} lbs to {'lose' if diff > 0 else 'gain'}")
+    return (f"{label}: {report['name']} {report['weight']} lbs ({goal}), "
+            f"{report['weekly_rate']:+.1f} lbs/week, last weighed {report['last_date'] or 'never'}, "
+            f"{report['week_sessions']} workouts this week")
+
+
+def run(task: Task) -> Dict:
+    """Run one command against one profile; module-level so worker processes can call it"""
+    command, db_dir, profile, out, fmt = task
+    report: Dict = {"db_dir": db_dir, "profile": profile}
+    if not profile_path(profile, db_dir).is_dir():
+        # Opening it would create an empty profile
+        report["error"] = "no such profile"
+        return report
+    usr_info = UsrData(db_dir, profile=profile)
+    try:
+        if usr_info.need_login():
+            report["error"] = "no profile set up"
+        elif command == "export":
+            report["file"] = out
+            report["exported"] = export_weights(usr_info, Path(out), fmt)  # pyright: ignore[reportArgumentType]
+        else:
+            report.update(stats(usr_info))
+    finally:
+        usr_info.close()
+    return report
+
+
+def build_tasks(args: argparse.Namespace) -> List[Task]:
+    db_dirs = args.db_dir or [config.DB_DIR]
+    fmt = args.format or ("jsonl" if args.file and args.file.endswith(".jsonl") else "csv")
+    if not args.all_profiles:
+        return [(args.command, db_dirs[0], args.profile, args.file, fmt)]
+    tasks: List[Task] = []
+    for db_dir in db_dirs:
+        for profile in list_profiles(db_dir):
+            out = None
+            if args.command == "export":
+                out = str(Path(args.file) / f"{Path(db_dir).name}-{profile}.{fmt}")
+            tasks.append((args.command, db_dir, profile, out, fmt))
+    return tasks
+
+
+def run_all(tasks: List[Task], jobs: Optional[int]) -> List[Dict]:
+    """Run tasks in a process pool, returning reports in task order"""
+    if len(tasks) == 1 or jobs == 1:
+        return [run(task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(run, tasks))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless fitness tracker reports")
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("file", nargs="?", help="export destination (a directory with --all-profiles)")
+    parser.add_argument("--profile", default=config.DEFAULT_PROFILE)
+    parser.add_argument("--db-dir", action="append", metavar="DIR",
+                        help=f"data directory (default {config.DB_DIR}); repeat with --all-profiles")
+    parser.add_argument("--all-profiles", action="store_true",
+                        help="report on every profile in every --db-dir in parallel")
+    parser.add_argument("--jobs", type=int, help="worker processes for --all-profiles (default: CPUs)")
+    parser.add_argument("--format", choices=FORMATS, help="export format (default from the file name)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per profile")
+    args = parser.parse_args(argv)
+
+    if args.command == "export" and not args.file:
+        parser.error("export needs a FILE")
+    if args.command == "export" and args.all_profiles:
+        Path(args.file).mkdir(parents=True, exist_ok=True)
+
+    reports = run_all(build_tasks(args), args.jobs)
+    for i, report in enumerate(reports):
+        if args.json:
+            print(json.dumps(report))
+        elif args.command == "export":
+            print(f"{report['db_dir']}:{report['profile']}: "
+                  + (report.get("error") or f"exported {report['exported']} entries to {report['file']}"))
+        elif args.command == "stats":
+            if i:
+                print()
+            print("\n".join(f"{key}: {value}" for key, value in report.items()))
+        else:
+            print(summary_line(report))
+    # Profiles nobody has set up yet are expected in a team-wide run
+    if not args.all_profiles and reports[0].get("error"):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,16 +4,61 @@ DB_DIR = "_Swol_"
 USR_DIR = "Usr"
 WORKOUTS_DIR = "Workouts"
 LIFTS_DIR = "Lifts"
+PROFILES_DIR = "profiles"
+
+# The default profile lives directly in DB_DIR, the original single-user layout
+DEFAULT_PROFILE = "default"
+LOCK_FILE = ".lock"
+
+# "files" keeps the _Swol_ text layout, "sqlite" uses DB_DIR/SQLITE_FILE
+STORAGE_BACKEND = "files"
+SQLITE_FILE = "swol.db"
+
+# "never" leaves syncing to the OS, "file" fsyncs each write, "full" also
+# fsyncs the directory after an atomic rename
+FSYNC_POLICY = "file"
+GROUP_COMMIT = False  # coalesce bursts of writes into one flush
+GROUP_COMMIT_DELAY = 0.05  # seconds a group-commit write may wait
+WRITE_BEHIND = True  # the app saves on a background thread instead of the event loop
+TEMP_SUFFIX = ".tmp"
 
 NAME_FILE = "name.txt"
 WEIGHT_FILE = "weight.txt"
 GOAL_FILE = "goal.txt"
+WEIGHT_SNAPSHOT_FILE = "weight.latest"
+WEIGHT_ZONES_FILE = "weight.zones.json"
+SNAPSHOT_DIR = "snapshots"  # binary snapshots of the logs, see logsnapshot.py
+WEIGHT_SNAP_FILE = "weight.snap"
+SESSIONS_FILE = "sessions.jsonl"
+ROLLUPS_FILE = "rollups.json"
+MANIFEST_SUFFIX = ".manifest.json"
+LIFT_STATS_SUFFIX = ".stats"  # directory of per-lift aggregate caches
+INDEX_SUFFIX = ".index.json"
+LIFT_IDS_FILE = "lift_ids.txt"
+WORKOUT_IDS_HEADER = "#ids"  # first line of workouts saved as lift IDs
 
 DATE_FORMAT = "%m-%d-%Y"
 
 MIN_WEIGHT = 1.0
 MAX_WEIGHT = 1000.0
+MAX_LOAD = 2000.0
+
+ROLLING_WINDOW_DAYS = 7
+EMA_SPAN = 10
+
+SEARCH_RESULT_LIMIT = 5
+SEARCH_DEBOUNCE = 0.08  # seconds of idle typing before a search runs
+WORKOUT_CACHE_SIZE = 256  # workouts whose lifts the browser keeps in memory
+WEIGHT_ZONE_ENTRIES = 1024  # weight entries per block of the zone map
+COMPACT_MIN_BYTES = 64 * 1024  # log text appended since the last snapshot before taking another
+IMPORT_BATCH_SIZE = 10000  # rows validated per batch during bulk import
+
+TRACE_FILE = "trace.jsonl"  # default for main.py --trace
+TRACE_BUFFER_SIZE = 256  # trace lines held before they are written out
+DEBUG_OVERLAY_REFRESH = 0.5  # seconds between overlay counter updates
 
+MSG_INVALID_PROFILE = "⌠Profile names cannot be blank, 'default' or contain / \\ :"
+MSG_PROFILE_EXISTS = "⚠️ Profile '{profile}' is already set up; choose it above"
 MSG_NAME_REQUIRED = "⌠Please enter your name"
 MSG_WEIGHT_REQUIRED = "⌠Please enter a valid weight"
 MSG_TARGET_REQUIRED = "⌠Please enter a valid target weight"
@@ -22,5 +67,15 @@ MSG_WEIGHT_UPDATED = "✅ Weight updated!"
 MSG_DUPLICATE_DATE = "⚠️ Weight already logged for this date"
 MSG_INVALID_DATE = "⌠Please enter a valid date (MM-DD-YYYY)"
 MSG_INVALID_WEIGHT = f"⌠Weight must be between {MIN_WEIGHT} and {MAX_WEIGHT} lbs"
+MSG_LIFT_REQUIRED = "⌠Please enter a lift name"
+MSG_INVALID_LIFT = "⌠Lift names cannot contain / \\ or start with ."
+MSG_INVALID_SETS = "⌠Sets and reps must be whole numbers above 0"
+MSG_INVALID_LOAD = f"⌠Load must be between 0 and {MAX_LOAD} lbs"
+MSG_LIFT_LOGGED = "✅ Lift logged!"
+MSG_LIFT_NOT_RENAMED = "⚠️ No lift has that name, or the new name is already taken"
+MSG_LIFT_RENAMED = "✅ Lift renamed!"
+MSG_SESSION_EMPTY = "⌠Log at least one lift before finishing"
+MSG_SESSION_SAVED = "✅ Workout saved: {minutes:.0f} min, {volume:,.0f} lbs lifted"
+MSG_SAVE_FAILED = "⌠Could not save: {error}"
 MSG_WORKOUT_LOGGED = "✅ Logged: {exercise} for {duration} minutes!"
 MSG_WORKOUT_INCOMPLETE = "⌠Please fill in both fields"
@@ -1,14 +1,16 @@
-
-from textual.app import App, ComposeResult
+import time
+from textual.app import ComposeResult
 from textual.binding import Binding
-from textual.theme import Theme
 from textual.screen import Screen
-from textual.widgets import Button, Label, Input, ListView, ListItem, Static, option_list
+from textual.widgets import Button, Label, Input
 from textual.containers import Vertical, Horizontal, VerticalScroll
-from textual import fuzzy
+from textual import work
+from textual.message import Message
+from textual.worker import get_current_worker
 from user import UsrData
-from datetime import date
+from search import LiftSearchIndex
 import config
+from writequeue import status_reporter
 
 class CreateWorkouts(Screen):
     CSS_PATH = "create_workout.tcss"
@@ -18,13 +20,25 @@ class CreateWorkouts(Screen):
         Binding(key="enter", action="select_lift", description="Select Lift"),
         Binding(key="escape", action="go_back", description="Back"),
     ]
+
+    class SearchResults(Message):
+        """Posted by the search worker when a query has been scored."""
+        def __init__(self, query: str, matches: list[str]) -> None:
+            super().__init__()
+            self.query = query
+            self.matches = matches
     
     def __init__(self, usr_info: UsrData):
         super().__init__()
         self.usr_info: UsrData = usr_info
         self.active_index = 0
         self.current_results = []
-        self.workout_lifts: list[str] = []
+        self.result_rows: list[Label] = []
+        self.highlighted_row: int | None = None
+        self.search_index: LiftSearchIndex | None = None
+        # delete button ID -> lift name, in the order they were added
+        self.workout_lifts: dict[str, str] = {}
+        self.next_button = 0
         self.workout_name: str = ""
 
     def compose(self) -> ComposeResult:
@@ -34,7 +48,10 @@ class CreateWorkouts(Screen):
             
             yield Label("Add Lifts:", id="add-lifts-label")
             yield Input(placeholder="Search for a lift...", id="search")
-            yield Vertical(id="results")
+            with Vertical(id="results"):
+                # Fixed pool of rows, rewritten in place on every search
+                for _ in range(config.SEARCH_RESULT_LIMIT):
+                    yield Label("", classes="result-row")
             
             yield Label("Current Lifts in Workout:", id="current-lifts-label")
             yield Vertical(id="workout_container")
@@ -45,6 +62,11 @@ class CreateWorkouts(Screen):
             
             yield Label("", id="status")
 
+    def on_mount(self) -> None:
+        self.result_rows = list(self.query("#results > Label").results(Label))
+        for row in self.result_rows:
+            row.display = False
+
     def on_input_changed(self, event: Input.Changed) -> None:
         event_id = event.input.id
         if event_id == "workout_name":
@@ -53,50 +75,76 @@ class CreateWorkouts(Screen):
             self._handle_search_change(event.value)
 
     def _handle_search_change(self, query: str) -> None:
-        """Separated search logic for clarity."""
-        results_container = self.query_one("#results", Vertical)
-        results_container.remove_children()
-        self.current_results = []
-
+        """Kick off a search for the new query, or clear results if it is empty."""
         if not query:
-            results_container.remove_class("visible")
+            self.workers.cancel_group(self, "search")
+            self._show_results([])
+            return
+        self._search_worker(query)
+
+    @work(thread=True, exclusive=True, group="search")
+    def _search_worker(self, query: str) -> None:
+        """Score the query off the event loop; newer keystrokes cancel this one."""
+        worker = get_current_worker()
+        time.sleep(config.SEARCH_DEBOUNCE)
+        if worker.is_cancelled:
             return
 
-        matcher = fuzzy.Matcher(query)
-        scored_lifts = [
-            (matcher.match(lift), lift) 
-            for lift in self.usr_info.lifts
-        ]
-        
-        # Filter and sort in one pass
-        scored_lifts = [(score, lift) for score, lift in scored_lifts if score > 0]
-        scored_lifts.sort(key=lambda item: item[0], reverse=True)
+        if self.search_index is None:
+            self.search_index = LiftSearchIndex(self.usr_info.lifts)
+        matches = self.search_index.search(
+            query, config.SEARCH_RESULT_LIMIT, cancelled=lambda: worker.is_cancelled
+        )
+        if matches is None or worker.is_cancelled:
+            return
+        self.post_message(self.SearchResults(query, matches))
 
-        if scored_lifts:
+    def on_create_workouts_search_results(self, message: SearchResults) -> None:
+        # Drop results for a query the user has already typed past
+        if message.query != self.query_one("#search", Input).value:
+            return
+        self._show_results(message.matches)
+
+    def _show_results(self, matches: list[str]) -> None:
+        """Write matches into the row pool, hiding the rows that are not needed."""
+        for i, row in enumerate(self.result_rows):
+            if i < len(matches):
+                if i >= len(self.current_results) or self.current_results[i] != matches[i]:
+                    row.update(matches[i])
+                row.display = True
+            else:
+                row.display = False
+        self.current_results = list(matches)
+
+        results_container = self.query_one("#results", Vertical)
+        if matches:
             results_container.add_class("visible")
-            for score, lift in scored_lifts[:5]:
-                results_container.mount(Label(lift))
-                self.current_results.append(lift)
-            
             self.active_index = 0
             self._update_active_highlight()
         else:
             results_container.remove_class("visible")
+            self._set_highlighted_row(None)
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
         if event.input.id == "search":
             self.action_select_lift()
 
     def _update_active_highlight(self) -> None:
-        labels = self.query("#results > Label")
-        if not labels:
+        if not self.current_results:
             return
 
-        for label in labels:
-            label.remove_class("active")
-        
-        self.active_index = self.active_index % len(labels)
-        labels[self.active_index].add_class("active")
+        self.active_index = self.active_index % len(self.current_results)
+        self._set_highlighted_row(self.active_index)
+
+    def _set_highlighted_row(self, index: int | None) -> None:
+        """Move the active class, touching only the old and new rows."""
+        if index == self.highlighted_row:
+            return
+        if self.highlighted_row is not None:
+            self.result_rows[self.highlighted_row].remove_class("active")
+        if index is not None:
+            self.result_rows[index].add_class("active")
+        self.highlighted_row = index
 
     def action_cursor_down(self) -> None:
         self.active_index += 1
@@ -113,11 +161,10 @@ class CreateWorkouts(Screen):
         selected_lift = self.current_results[self.active_index]
         
         # Prevent duplicates
-        if selected_lift in self.workout_lifts:
+        if selected_lift in self.workout_lifts.values():
             self.query_one("#status", Label).update(f"⚠ {selected_lift} already added")
             return
         
-        self.workout_lifts.append(selected_lift)
         self._add_lift_to_display(selected_lift)
         self._clear_search()
 
@@ -126,9 +173,11 @@ class CreateWorkouts(Screen):
         # Create all widgets
         lift_container = Horizontal(classes="lift-item")
         label = Label(f"• {lift_name}", classes="lift-name")
-        # Replace spaces with underscores for valid ID
-        safe_id = lift_name.replace(" ", "_")
-        button = Button("×", classes="delete-btn", id=f"delete-{safe_id}")
+        # A counter makes a valid widget ID whatever the name contains
+        button_id = f"delete-{self.next_button}"
+        self.next_button += 1
+        self.workout_lifts[button_id] = lift_name
+        button = Button("×", classes="delete-btn", id=button_id)
         
         # Mount container to parent, then mount children to container
         self.query_one("#workout_container").mount(lift_container)
@@ -139,28 +188,22 @@ class CreateWorkouts(Screen):
     def _clear_search(self) -> None:
         """Helper to clear search state."""
         self.query_one("#search", Input).value = ""
-        results_container = self.query_one("#results", Vertical)
-        results_container.remove_children()
-        results_container.remove_class("visible")
-        self.current_results = []
+        self._show_results([])
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         button_id = event.button.id
         
         if button_id and button_id.startswith("delete-"):
-            # Convert ID back to lift name
-            safe_name = button_id.replace("delete-", "")
-            lift_name = safe_name.replace("_", " ")
-            self._remove_lift(lift_name, event.button.parent)  # pyright: ignore[reportArgumentType]
+            self._remove_lift(button_id, event.button.parent)  # pyright: ignore[reportArgumentType]
         elif button_id == "submit":
             self._submit_workout()
         elif button_id == "back":
             self.action_go_back()
 
-    def _remove_lift(self, lift_name: str, container: Horizontal) -> None:
+    def _remove_lift(self, button_id: str, container: Horizontal) -> None:
         """Remove a lift from the workout."""
-        if lift_name in self.workout_lifts:
-            self.workout_lifts.remove(lift_name)
+        lift_name = self.workout_lifts.pop(button_id, None)
+        if lift_name is not None:
             container.remove()
             self.query_one("#status", Label).update(f"✗ Removed {lift_name}")
 
@@ -174,7 +217,8 @@ class CreateWorkouts(Screen):
             self.query_one("#status", Label).update("⚠ Please add at least one lift")
             return
         
-        self.usr_info.write_workout(self.workout_name, self.workout_lifts)
+        # New lifts get their IDs when the queued write runs, not on the event loop
+        self.usr_info.write_workout(self.workout_name, list(self.workout_lifts.values()), status_reporter(self))
         self.query_one("#status", Label).update(f"✓ Workout '{self.workout_name}' created!")
         # Optionally auto-close after success:
         # self.set_timer(1.5, self.action_go_back)
@@ -0,0 +1,33 @@
+from textual.widgets import Static
+import config
+import instrument
+
+OVERLAY_ROWS = 8
+
+
+class DebugOverlay(Static):
+    """Live instrumentation counters, toggled with F12 in a traced session"""
+
+    DEFAULT_CSS = """
+    DebugOverlay {
+        dock: right;
+        overlay: screen;
+        width: 60;
+        height: auto;
+        background: $panel;
+        border: round $accent;
+        padding: 0 1;
+    }
+    """
+
+    def on_mount(self) -> None:
+        self.refresh_counters()
+        self.set_interval(config.DEBUG_OVERLAY_REFRESH, self.refresh_counters)
+
+    def refresh_counters(self) -> None:
+        snap = instrument.snapshot()
+        lines = [f"opens {snap['opens']}   read {snap['bytes_read']:,} B", ""]
+        for name, stats in list(snap["sites"].items())[:OVERLAY_ROWS]:
+            lines.append(f"{name[:30]:<30} {stats['calls']:>5}x "
+                         f"{stats['avg_ms']:>7.2f} avg {stats['max_ms']:>7.1f} max")
+        self.update("\n".join(lines))
@@ -0,0 +1,188 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, Optional, Tuple, Union
+import config
+
+FSYNC_POLICIES = ("never", "file", "full")
+# mkstemp creates files readable only by us; give replacements the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _fsync_dir(dir_path: Path) -> None:
+    """Persist a rename by syncing the directory entry (no-op where unsupported)"""
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: Path, data: Union[str, bytes], fsync: str) -> Path:
+    # A fresh name every time: sessions sharing a profile may write the
+    # same cache at once without holding the profile lock
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=config.TEMP_SUFFIX, dir=path.parent)
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, 0o666 & ~_UMASK)
+        with open(fd, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            if fsync != "never":
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return Path(tmp)
+
+
+def _replace(tmp: Path, path: Path) -> None:
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def atomic_write(path: Path, data: Union[str, bytes], fsync: Optional[str] = None) -> None:
+    """Replace path with data so readers see either the old or the new file.
+
+    ``fsync`` is "never" (leave it to the OS), "file" (sync the data before
+    the rename) or "full" (also sync the directory so the rename survives a
+    power cut). Defaults to config.FSYNC_POLICY.
+    """
+    fsync = fsync or config.FSYNC_POLICY
+    _replace(_write_temp(path, data, fsync), path)
+    if fsync == "full":
+        _fsync_dir(path.parent)
+
+
+def stat_stamp(st: os.stat_result) -> str:
+    """Size and mtime as "size mtime_ns"; caches keep it to notice their source changed"""
+    return f"{st.st_size} {st.st_mtime_ns}"
+
+
+def file_stamp(path: Path) -> Optional[str]:
+    """stat_stamp of a file, or None if it does not exist"""
+    try:
+        return stat_stamp(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def file_id(path: Path) -> Tuple[int, int]:
+    """(inode, size) of an append-only file, or (0, 0) if it does not exist.
+
+    Growth on the same inode is an append; anything else is a replacement.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_ino, st.st_size)
+
+
+def write_cache(path: Path, data: Union[str, bytes]) -> bool:
+    """Replace a file that can be rebuilt from the data it was derived from.
+
+    It is never synced, and a failed write is ignored since the next reader
+    just rebuilds it. Returns whether it was written.
+    """
+    try:
+        atomic_write(path, data, "never")
+    except OSError:
+        return False
+    return True
+
+
+def durable_append(path: Path, data: str, fsync: Optional[str] = None) -> None:
+    """Append to a log, syncing it unless the policy is "never" """
+    fsync = fsync or config.FSYNC_POLICY
+    with open(path, 'a') as f:
+        f.write(data)
+        if fsync != "never":
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class WriteLayer:
+    """Whole-file writes with optional group commit.
+
+    Without group commit every write is an immediate atomic_write. With it,
+    writes are held in memory and flushed together after a short delay or
+    when a ``batch()`` block ends, so a burst that rewrites the same file
+    several times only writes it once and each directory is synced once.
+    """
+
+    def __init__(self, fsync: Optional[str] = None,
+                 group_commit: Optional[bool] = None,
+                 delay: Optional[float] = None,
+                 lock: Optional[ContextManager] = None) -> None:
+        self.fsync = fsync or config.FSYNC_POLICY
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{self.fsync}'")
+        self.group_commit = config.GROUP_COMMIT if group_commit is None else group_commit
+        self.delay = config.GROUP_COMMIT_DELAY if delay is None else delay
+        self._pending: Dict[Path, str] = {}
+        self._lock = threading.Lock()
+        # Held while files are actually written, e.g. a ProfileLock
+        self._write_lock = lock if lock is not None else nullcontext()
+        self._timer: Optional[threading.Timer] = None
+        self._depth = 0
+
+    def write(self, path: Path, data: str) -> None:
+        if not self.group_commit and self._depth == 0:
+            with self._write_lock:
+                atomic_write(path, data, self.fsync)
+            return
+        with self._lock:
+            self._pending[path] = data
+            if self._depth == 0 and self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def pending(self, path: Path) -> Optional[str]:
+        """Data waiting to be written to path, if any"""
+        with self._lock:
+            return self._pending.get(path)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Hold every write in the block and commit them together at the end"""
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write everything pending, syncing each touched directory once"""
+        # Same order as storage methods that write while holding the profile
+        # lock: the write lock first, then our own
+        with self._write_lock, self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            file_fsync = "never" if self.fsync == "never" else "file"
+            for path, data in pending.items():
+                _replace(_write_temp(path, data, file_fsync), path)
+            if self.fsync == "full":
+                for dir_path in {path.parent for path in pending}:
+                    _fsync_dir(dir_path)
+
+    def close(self) -> None:
+        self.flush()
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 import config
 
 def is_valid_date(date_str: str) -> bool:
@@ -17,6 +17,35 @@ def parse_date(date_str: str) -> datetime:
     """Parse a date string to datetime object"""
     return datetime.strptime(date_str, config.DATE_FORMAT)
 
+def parse_date_ordinal(date_str: str) -> int:
+    """Parse a date string straight to a day ordinal"""
+    if (config.DATE_FORMAT == "%m-%d-%Y" and len(date_str) == 10 and
+            date_str[2] == date_str[5] == "-" and
+            (date_str[:2] + date_str[3:5] + date_str[6:]).isdigit()):
+        # Slicing is much faster than strptime when loading long histories
+        try:
+            return date(int(date_str[6:]), int(date_str[:2]), int(date_str[3:5])).toordinal()
+        except ValueError:
+            pass
+    return parse_date(date_str).toordinal()
+
+def format_date_ordinal(day: int) -> str:
+    """Format a day ordinal the way parse_date_ordinal reads it"""
+    d = date.fromordinal(day)
+    if config.DATE_FORMAT == "%m-%d-%Y" and d.year >= 1000:
+        return f"{d.month:02d}-{d.day:02d}-{d.year}"
+    return d.strftime(config.DATE_FORMAT)
+
+def week_start_ordinal(day: int) -> int:
+    """Day ordinal of the Monday starting the week that contains day"""
+    return day - (day - 1) % 7
+
+def estimate_one_rep_max(load: float, reps: int) -> float:
+    """Estimated one-rep max using the Epley formula"""
+    if reps <= 1:
+        return load
+    return load * (1 + reps / 30)
+
 def get_days_between(date1_str: str, date2_str: str) -> int:
     """Calculate days between two date strings"""
     try:
@@ -26,22 +55,16 @@ def get_days_between(date1_str: str, date2_str: str) -> int:
     except ValueError:
         return 0
 
-def calculate_weight_change_rate(history: list) -> float:
-    """Calculate average weight change per week from history"""
+def calculate_weight_change_rate(history) -> float:
+    """Calculate average weight change per week from a WeightHistory"""
     if len(history) < 2:
         return 0.0
     
-    try:
-        first_weight, first_date = history[0]
-        last_weight, last_date = history[-1]
-        
-        days = get_days_between(first_date, last_date)
-        if days == 0:
-            return 0.0
-        
-        weight_change = float(last_weight) - float(first_weight)
-        weeks = days / 7.0
-        
-        return weight_change / weeks if weeks > 0 else 0.0
-    except (ValueError, IndexError):
+    days = history.days[-1] - history.days[0]
+    if days == 0:
         return 0.0
+    
+    weight_change = history.weights[-1] - history.weights[0]
+    weeks = days / 7.0
+    
+    return weight_change / weeks if weeks > 0 else 0.0
@@ -0,0 +1,88 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Tuple
+from helpers import parse_date_ordinal
+
+
+class WeightHistory:
+    """Date-ordered weight history in two flat arrays.
+
+    Dates are day ordinals in an ``array('i')`` and weights are in an
+    ``array('d')``, so a long history costs 12 bytes per entry instead of a
+    pair of strings. Lookups by date use bisect.
+    """
+
+    __slots__ = ("_days", "_weights")
+
+    def __init__(self, days: Optional[array] = None, weights: Optional[array] = None) -> None:
+        self._days = days if days is not None else array('i')
+        self._weights = weights if weights is not None else array('d')
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, str]]) -> "WeightHistory":
+        """Build from (weight, date) string tuples in any order"""
+        pairs = sorted((parse_date_ordinal(date_str), float(weight)) for weight, date_str in entries)
+        return cls(array('i', (day for day, _ in pairs)), array('d', (w for _, w in pairs)))
+
+    @classmethod
+    def from_columns(cls, days: array, weights: array) -> "WeightHistory":
+        """Build from parallel day-ordinal and weight arrays in any order"""
+        if all(a <= b for a, b in zip(days, islice(days, 1, None))):
+            return cls(days, weights)
+        order = sorted(range(len(days)), key=days.__getitem__)
+        return cls(array('i', (days[i] for i in order)), array('d', (weights[i] for i in order)))
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def __iter__(self) -> Iterator[Tuple[float, date]]:
+        for day, weight in zip(self._days, self._weights):
+            yield weight, date.fromordinal(day)
+
+    def __getitem__(self, i: int) -> Tuple[float, date]:
+        return self._weights[i], date.fromordinal(self._days[i])
+
+    def __repr__(self) -> str:
+        return f"WeightHistory({len(self)} entries)"
+
+    @property
+    def days(self) -> array:
+        """Day ordinals in ascending order"""
+        return self._days
+
+    @property
+    def weights(self) -> array:
+        """Weights matching ``days``"""
+        return self._weights
+
+    def add(self, weight: float, day: date) -> None:
+        """Insert an entry, keeping date order"""
+        ordinal = day.toordinal()
+        pos = bisect_right(self._days, ordinal)
+        self._days.insert(pos, ordinal)
+        self._weights.insert(pos, weight)
+
+    def on(self, day: date) -> Optional[float]:
+        """Weight logged on a date, if any"""
+        ordinal = day.toordinal()
+        pos = bisect_left(self._days, ordinal)
+        if pos < len(self._days) and self._days[pos] == ordinal:
+            return self._weights[pos]
+        return None
+
+    def between(self, start: date, end: date) -> "WeightHistory":
+        """Entries dated from start to end inclusive"""
+        lo = bisect_left(self._days, start.toordinal())
+        hi = bisect_right(self._days, end.toordinal())
+        return WeightHistory(self._days[lo:hi], self._weights[lo:hi])
+
+    def to_numpy(self):
+        """(days, weights) as NumPy arrays sharing this history's memory.
+
+        The history cannot grow while these arrays are alive.
+        """
+        import numpy as np
+        return (np.frombuffer(self._days, dtype=np.intc),
+                np.frombuffer(self._weights, dtype=np.float64))
@@ -0,0 +1,252 @@
+"""Opt-in instrumentation for the data layer and screen handlers.
+
+Nothing here runs unless ``enable()`` is called (``python main.py --trace``),
+so a normal session pays nothing for it. Once enabled it wraps the UsrData
+I/O methods and every screen's ``on_button_pressed``/``on_input_changed``,
+counts file opens and bytes read through ``open``, keeps a latency
+histogram per call site and appends one JSON line per call to a trace file.
+"""
+import atexit
+import builtins
+import functools
+import importlib
+import inspect
+import io
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import config
+
+# Upper bounds of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+USR_DATA_METHODS = (
+    "workouts", "lifts", "has_weight_for_date", "need_login", "write_usr_name",
+    "write_usr_weight_first", "write_usr_weight", "add_weights", "write_usr_target_weight",
+    "get_name", "get_weight", "get_goal_weight", "get_weight_history", "get_weight_range",
+    "set_starting_vals", "close", "log_lift", "get_lift_stats", "get_lift_entries",
+    "record_session", "get_sessions", "get_rollups",
+    "get_workout_lifts", "write_workout", "get_workout_lift_ids", "write_workout_ids",
+    "get_lift_id", "rename_lift", "find_workouts", "compact",
+)
+HANDLER_NAMES = ("on_button_pressed", "on_input_changed")
+SCREEN_MODULES = ("app", "updateWeight", "logLift", "createWorkouts", "workoutBrowser",
+                  "startWorkout")
+
+enabled = False
+
+
+class Stats:
+    """Running totals and a latency histogram for one call site"""
+    __slots__ = ("calls", "total_ms", "max_ms", "opens", "bytes_read", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.opens = 0
+        self.bytes_read = 0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, ms: float, opens: int, bytes_read: int) -> None:
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.opens += opens
+        self.bytes_read += bytes_read
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "opens": self.opens,
+            "bytes_read": self.bytes_read,
+            "histogram": dict(zip([f"<={b}ms" for b in HISTOGRAM_BOUNDS_MS] + ["inf"], self.buckets)),
+        }
+
+
+class _ThreadCounters(threading.local):
+    opens = 0
+    bytes_read = 0
+
+
+_real_open = builtins.open
+_lock = threading.Lock()
+_local = _ThreadCounters()
+_stats: Dict[str, Stats] = {}
+_totals = {"opens": 0, "bytes_read": 0}
+_trace = None
+_buffer: List[str] = []
+
+
+class _CountingFile:
+    """File proxy that counts what is read through it.
+
+    Text files count characters rather than bytes, which is close enough
+    for the ASCII files the app keeps.
+    """
+
+    def __init__(self, f) -> None:
+        self._f = f
+
+    def _count(self, data):
+        _local.bytes_read += len(data)
+        with _lock:
+            _totals["bytes_read"] += len(data)
+        return data
+
+    def read(self, *args):
+        return self._count(self._f.read(*args))
+
+    def readline(self, *args):
+        return self._count(self._f.readline(*args))
+
+    def readlines(self, *args):
+        lines = self._f.readlines(*args)
+        self._count("".join(lines) if lines and isinstance(lines[0], str) else b"".join(lines))
+        return lines
+
+    def __iter__(self):
+        for line in self._f:
+            yield self._count(line)
+
+    def __enter__(self):
+        self._f.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._f.__exit__(*exc)
+
+    def __getattr__(self, name: str):
+        return getattr(self._f, name)
+
+
+def _counting_open(*args, **kwargs):
+    f = _real_open(*args, **kwargs)
+    _local.opens += 1
+    with _lock:
+        _totals["opens"] += 1
+    return _CountingFile(f)
+
+
+def _record(name: str, stats: Stats, ms: float, opens: int, bytes_read: int) -> None:
+    with _lock:
+        stats.add(ms, opens, bytes_read)
+        if _trace is None:
+            return
+        _buffer.append(json.dumps({
+            "ts": round(time.time(), 6),
+            "name": name,
+            "ms": round(ms, 4),
+            "opens": opens,
+            "bytes_read": bytes_read,
+            "thread": threading.current_thread().name,
+        }))
+        if len(_buffer) >= config.TRACE_BUFFER_SIZE:
+            _flush_locked()
+
+
+def _flush_locked() -> None:
+    if _trace is not None and _buffer:
+        _trace.write("\n".join(_buffer) + "\n")
+        _trace.flush()
+    _buffer.clear()
+
+
+def traced(name: str, fn: Callable) -> Callable:
+    """Wrap fn so every call is timed and its file I/O counted under name"""
+    stats = _stats.setdefault(name, Stats())
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            opens, read = _local.opens, _local.bytes_read
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _record(name, stats, (time.perf_counter() - start) * 1000,
+                        _local.opens - opens, _local.bytes_read - read)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        opens, read = _local.opens, _local.bytes_read
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(name, stats, (time.perf_counter() - start) * 1000,
+                    _local.opens - opens, _local.bytes_read - read)
+    return wrapper
+
+
+def _instrument_class(cls: type, names) -> None:
+    for name in names:
+        attr = cls.__dict__.get(name)
+        label = f"{cls.__name__}.{name}"
+        if isinstance(attr, property):
+            setattr(cls, name, property(traced(label, attr.fget), attr.fset, attr.fdel, attr.__doc__))
+        elif callable(attr):
+            setattr(cls, name, traced(label, attr))
+
+
+def enable(trace_path: Optional[str] = None) -> None:
+    """Start recording; call before the app is created.
+
+    This imports every screen up front so their handlers can be wrapped,
+    which gives up lazy screen loading for the traced session.
+    """
+    global enabled, _trace
+    if enabled:
+        return
+    enabled = True
+    if trace_path:
+        _trace = _real_open(trace_path, 'a')
+    builtins.open = _counting_open
+    io.open = _counting_open
+
+    from user import UsrData
+    from textual.screen import Screen
+    _instrument_class(UsrData, USR_DATA_METHODS)
+    for module_name in SCREEN_MODULES:
+        module = importlib.import_module(module_name)
+        for obj in vars(module).values():
+            if isinstance(obj, type) and issubclass(obj, Screen) and obj.__module__ == module_name:
+                _instrument_class(obj, HANDLER_NAMES)
+    atexit.register(disable)
+
+
+def disable() -> None:
+    """Flush and close the trace and stop counting file I/O.
+
+    Wrapped methods stay wrapped; their numbers are simply no longer written.
+    """
+    global _trace
+    builtins.open = _real_open
+    io.open = _real_open
+    with _lock:
+        _flush_locked()
+        if _trace is not None:
+            _trace.close()
+            _trace = None
+
+
+def snapshot() -> Dict[str, Any]:
+    """Totals plus per-call-site stats, busiest first"""
+    with _lock:
+        sites = sorted(_stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            "opens": _totals["opens"],
+            "bytes_read": _totals["bytes_read"],
+            "sites": {name: stats.to_dict() for name, stats in sites if stats.calls},
+        }
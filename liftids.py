@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from durable import durable_append, file_id
+
+
+class LiftRegistry:
+    """Stable integer IDs for lift names.
+
+    Stored as an append-only file of ``id<TAB>name`` lines. A later line
+    for an id that already exists is a rename, so renaming a lift is one
+    short append and nothing that refers to it by id has to change. Former
+    names are remembered so workouts saved before the rename, which still
+    list names, resolve to the lift's current name.
+
+    Writers must hold the profile lock; ``sync()`` picks up lines another
+    session appended.
+    """
+
+    def __init__(self, path: Path, fsync: str = "never") -> None:
+        self.path = path
+        self.fsync = fsync
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._former: Dict[str, int] = {}
+        self._next_id = 1
+        self._loaded = False
+        self._seen = (0, 0)
+
+    def _load(self) -> None:
+        self._ids, self._names, self._former = {}, {}, {}
+        self._next_id = 1
+        self._seen = (0, 0)
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+                self._seen = (os.fstat(f.fileno()).st_ino, self._apply(data))
+        except FileNotFoundError:
+            pass
+        self._loaded = True
+
+    def _apply(self, data: bytes) -> int:
+        """Apply the complete lines in data, returning how many bytes they took"""
+        # A line without its newline is still being appended; it is read again next sync
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].decode().split("\n"):
+            if not line.strip():
+                continue
+            lift_id, name = line.split("\t", 1)
+            self._set(int(lift_id), name)
+        return end
+
+    def _set(self, lift_id: int, name: str) -> None:
+        old = self._names.get(lift_id)
+        if old is not None and old != name:
+            del self._ids[old]
+            self._former[old] = lift_id
+        self._names[lift_id] = name
+        self._ids[name] = lift_id
+        self._former.pop(name, None)
+        self._next_id = max(self._next_id, lift_id + 1)
+
+    def sync(self) -> None:
+        """Load the registry, or read whatever was appended since we last did"""
+        if not self._loaded:
+            self._load()
+            return
+        ino, size = file_id(self.path)
+        seen_ino, seen_size = self._seen
+        if (ino, size) == self._seen:
+            return
+        if ino != seen_ino or size < seen_size:
+            self._load()
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(seen_size)
+            data = f.read()
+        self._seen = (ino, seen_size + self._apply(data))
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def id_for(self, name: str) -> Optional[int]:
+        """ID of the lift currently called name, if it has one"""
+        self._ensure_loaded()
+        return self._ids.get(name)
+
+    def name_for(self, lift_id: int) -> Optional[str]:
+        """Current name of a lift"""
+        self._ensure_loaded()
+        return self._names.get(lift_id)
+
+    def resolve(self, name: str) -> str:
+        """Current name for a name that may have been renamed since it was saved"""
+        self._ensure_loaded()
+        if name in self._ids:
+            return name
+        lift_id = self._former.get(name)
+        return self._names[lift_id] if lift_id is not None else name
+
+    def intern(self, names: Iterable[str]) -> List[int]:
+        """IDs for names, assigning new ones in a single append"""
+        self.sync()
+        ids: List[int] = []
+        new_lines: List[str] = []
+        for name in names:
+            lift_id = self._ids.get(name)
+            if lift_id is None:
+                lift_id = self._next_id
+                self._set(lift_id, name)
+                new_lines.append(f"{lift_id}\t{name}\n")
+            ids.append(lift_id)
+        if new_lines:
+            self._append("".join(new_lines))
+        return ids
+
+    def rename(self, lift_id: int, new_name: str) -> None:
+        """Give a lift a new name; its ID stays the same"""
+        self.sync()
+        if new_name in self._ids:
+            raise ValueError(f"Lift '{new_name}' already exists")
+        self._set(lift_id, new_name)
+        self._append(f"{lift_id}\t{new_name}\n")
+
+    def _append(self, data: str) -> None:
+        durable_append(self.path, data, self.fsync)
+        self._seen = file_id(self.path)
@@ -0,0 +1,183 @@
+import json
+from pathlib import Path
+from typing import ContextManager, Dict, List, Optional, Tuple
+import config
+import logsnapshot
+from durable import durable_append, file_stamp, write_cache
+from helpers import estimate_one_rep_max, format_date_ordinal, parse_date_ordinal, week_start_ordinal
+
+# (date, sets, reps, load)
+LiftEntry = Tuple[str, int, int, float]
+
+
+def format_entry(date_str: str, sets: int, reps: int, load: float) -> str:
+    """One line of a lift log, without the newline"""
+    return f"{date_str},{sets},{reps},{load:g}"
+
+
+def parse_entry(line: str) -> LiftEntry:
+    date_str, sets, reps, load = line.split(",")
+    return date_str, int(sets), int(reps), float(load)
+
+
+class LiftStats:
+    """Aggregates for one lift, updated one logged entry at a time"""
+
+    __slots__ = ("entries", "best_e1rm", "best_e1rm_date", "top_load", "top_reps",
+                 "top_date", "total_volume", "weekly_volume")
+
+    def __init__(self) -> None:
+        self.entries = 0
+        self.best_e1rm = 0.0
+        self.best_e1rm_date = ""
+        self.top_load = 0.0
+        self.top_reps = 0
+        self.top_date = ""
+        self.total_volume = 0.0
+        # Monday's day ordinal -> sets * reps * load logged that week
+        self.weekly_volume: Dict[int, float] = {}
+
+    def add(self, date_str: str, sets: int, reps: int, load: float) -> None:
+        self._add(parse_date_ordinal(date_str), sets, reps, load, date_str)
+
+    def add_day(self, day: int, sets: int, reps: int, load: float) -> None:
+        """Like add, for an entry whose date is already a day ordinal"""
+        self._add(day, sets, reps, load, None)
+
+    def _add(self, day: int, sets: int, reps: int, load: float, date_str: Optional[str]) -> None:
+        self.entries += 1
+        e1rm = estimate_one_rep_max(load, reps)
+        if e1rm > self.best_e1rm:
+            self.best_e1rm = e1rm
+            self.best_e1rm_date = date_str = date_str or format_date_ordinal(day)
+        if (load, reps) > (self.top_load, self.top_reps):
+            self.top_load, self.top_reps = load, reps
+            self.top_date = date_str or format_date_ordinal(day)
+        volume = sets * reps * load
+        self.total_volume += volume
+        week = week_start_ordinal(day)
+        self.weekly_volume[week] = self.weekly_volume.get(week, 0.0) + volume
+
+    def volume_for_week(self, day: int) -> float:
+        """Volume logged in the week containing the given day ordinal"""
+        return self.weekly_volume.get(week_start_ordinal(day), 0.0)
+
+    def to_dict(self) -> Dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["weekly_volume"] = {str(week): volume for week, volume in self.weekly_volume.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LiftStats":
+        stats = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(stats, name, data[name])
+        stats.weekly_volume = {int(week): volume for week, volume in data.get("weekly_volume", {}).items()}
+        return stats
+
+
+class LiftLog:
+    """Per-lift append logs with a cache of each lift's aggregates.
+
+    Each lift's log is its ``Lifts/<name>.txt`` file with one
+    ``date,sets,reps,load`` line per entry. Each lift's aggregates are
+    cached in ``stats_dir/<name>.json`` next to the size and mtime of the
+    log they were computed from, so an append rewrites only that lift's
+    cache. A lift whose log was changed behind our back is rescanned once,
+    from its snapshot in ``snap_dir`` plus the text after it when it has
+    been compacted.
+    """
+
+    def __init__(self, stats_dir: Path, fsync: str = "never",
+                 snap_dir: Optional[Path] = None) -> None:
+        self.stats_dir = stats_dir
+        self.fsync = fsync
+        self.snap_dir = snap_dir
+        # lift -> (stamp of its log, stats), for the lifts looked at so far
+        self._cache: Dict[str, Tuple[Optional[str], LiftStats]] = {}
+
+    def cache_path(self, path: Path) -> Path:
+        """Where the cached aggregates of a lift's log live"""
+        return self.stats_dir / (path.stem + ".json")
+
+    def _read_cache(self, lift: str, path: Path) -> Optional[Tuple[Optional[str], LiftStats]]:
+        cached = self._cache.get(lift)
+        if cached is not None:
+            return cached
+        try:
+            with open(self.cache_path(path), 'r') as f:
+                item = json.load(f)
+            cached = (item["stamp"], LiftStats.from_dict(item["stats"]))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        self._cache[lift] = cached
+        return cached
+
+    def _write_cache(self, lift: str, path: Path, stamp: Optional[str], stats: LiftStats) -> None:
+        self._cache[lift] = (stamp, stats)
+        self.stats_dir.mkdir(parents=True, exist_ok=True)
+        write_cache(self.cache_path(path), json.dumps({"stamp": stamp, "stats": stats.to_dict()}))
+
+    def snap_path(self, path: Path) -> Optional[Path]:
+        """Where the snapshot of a lift's log lives"""
+        return self.snap_dir / (path.stem + ".snap") if self.snap_dir is not None else None
+
+    def entries(self, path: Path) -> List[LiftEntry]:
+        """Every entry in a lift's log, oldest first"""
+        try:
+            with open(path, 'r') as f:
+                return [parse_entry(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _replay(self, path: Path) -> LiftStats:
+        """Aggregates from the log's snapshot, if it has one, and the text after it"""
+        stats = LiftStats()
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return stats
+        with f:
+            snap_path = self.snap_path(path)
+            snap = logsnapshot.load(logsnapshot.LIFT_LAYOUT, f, snap_path) if snap_path else None
+            if snap is not None:
+                for entry in zip(snap.ints(0), snap.ints(1), snap.ints(2), snap.floats(3)):
+                    stats.add_day(*entry)
+                f.seek(snap.source_len)
+            data = f.read().decode()
+        for line in data.split("\n"):
+            if line.strip():
+                stats.add(*parse_entry(line))
+        return stats
+
+    def compact(self, path: Path, lock: ContextManager) -> int:
+        """Snapshot a lift's log if enough was appended since the last snapshot; returns entries covered"""
+        snap_path = self.snap_path(path)
+        if snap_path is None:
+            return 0
+        snap_path.parent.mkdir(parents=True, exist_ok=True)
+        return logsnapshot.compact(logsnapshot.LIFT_LAYOUT, path, snap_path, lock,
+                                   config.COMPACT_MIN_BYTES)
+
+    def stats(self, lift: str, path: Path) -> LiftStats:
+        """Aggregates for a lift, rescanning its log only if it changed elsewhere"""
+        stamp = file_stamp(path)
+        if stamp is None:
+            return LiftStats()
+        cached = self._read_cache(lift, path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        stats = self._replay(path)
+        self._write_cache(lift, path, stamp, stats)
+        return stats
+
+    def append(self, lift: str, path: Path, date_str: str, sets: int, reps: int,
+               load: float) -> LiftStats:
+        """Log one entry and fold it into the lift's aggregates"""
+        stats = self.stats(lift, path)
+        durable_append(path, format_entry(date_str, sets, reps, load) + "\n", self.fsync)
+        stats.add(date_str, sets, reps, load)
+        self._write_cache(lift, path, file_stamp(path), stats)
+        return stats
@@ -0,0 +1,86 @@
+from datetime import date
+from textual.screen import Screen
+from textual.widgets import Button, Label, Input
+from textual.containers import Vertical
+from user import UsrData
+from liftlog import LiftStats
+import config
+from writequeue import status_reporter
+
+class LogLift(Screen):
+    def __init__(self, usr_info: UsrData):
+        super().__init__()
+        self.usr_info = usr_info
+        # Lift whose stats are showing, so leaving the box again does not look them up twice
+        self.stats_lift: str | None = None
+
+    def compose(self):
+        with Vertical():
+            yield Label("🏋 Log a Lift")
+            yield Input(placeholder="Lift name", id="lift")
+            yield Input(placeholder="Sets", id="sets", type="integer")
+            yield Input(placeholder="Reps", id="reps", type="integer")
+            yield Input(placeholder="Load (lbs)", id="load", type="number")
+            yield Input(placeholder=f"Enter date: {config.DATE_FORMAT} (default is today)", id="date")
+            yield Label("", id="lift_stats")
+            yield Button("Log", id="log")
+            yield Button("Back", id="back")
+            yield Label("", id="status")
+
+    def _show_stats(self, stats: LiftStats) -> None:
+        stats_label = self.query_one("#lift_stats")
+        if not stats.entries:
+            stats_label.update("")  # pyright: ignore[reportAttributeAccessIssue]
+            return
+        this_week = stats.volume_for_week(date.today().toordinal())
+        stats_label.update(  # pyright: ignore[reportAttributeAccessIssue]
+            f"Best e1RM: {stats.best_e1rm:.1f} lbs ({stats.best_e1rm_date})\n"
+            f"Top set: {stats.top_load:g} lbs x {stats.top_reps} ({stats.top_date})\n"
+            f"Volume this week: {this_week:,.0f} lbs"
+        )
+
+    def _lookup_stats(self) -> None:
+        """Show the stats for the lift named in the box"""
+        lift = self.query_one("#lift", Input).value.strip()
+        if lift == self.stats_lift:
+            return
+        valid, _ = self.usr_info.validate_lift_name(lift)
+        self._show_stats(self.usr_info.get_lift_stats(lift) if valid else LiftStats())
+        self.stats_lift = lift
+
+    def on_input_changed(self, event: Input.Changed):
+        # Looked up once the name is finished, on Enter or leaving the box, not per keystroke
+        if event.input.id == "lift" and self.stats_lift is not None:
+            self._show_stats(LiftStats())
+            self.stats_lift = None
+
+    def on_input_submitted(self, event: Input.Submitted):
+        if event.input.id == "lift":
+            self._lookup_stats()
+
+    def on_input_blurred(self, event: Input.Blurred):
+        if event.input.id == "lift":
+            self._lookup_stats()
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "log":
+            lift = self.query_one("#lift").value  # pyright: ignore[reportAttributeAccessIssue]
+            sets = self.query_one("#sets").value  # pyright: ignore[reportAttributeAccessIssue]
+            reps = self.query_one("#reps").value  # pyright: ignore[reportAttributeAccessIssue]
+            load = self.query_one("#load").value  # pyright: ignore[reportAttributeAccessIssue]
+            date_value = self.query_one("#date").value  # pyright: ignore[reportAttributeAccessIssue]
+            status_label = self.query_one("#status")
+
+            success, msg = self.usr_info.log_lift(lift, sets, reps, load, date_value,
+                                                  status_reporter(self))
+            status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
+
+            if success:
+                self.query_one("#sets").value = ""  # pyright: ignore[reportAttributeAccessIssue]
+                self.query_one("#reps").value = ""  # pyright: ignore[reportAttributeAccessIssue]
+                self.query_one("#load").value = ""  # pyright: ignore[reportAttributeAccessIssue]
+                self.stats_lift = None
+                self._lookup_stats()
+
+        elif event.button.id == "back":
+            self.app.pop_screen()
@@ -0,0 +1,293 @@
+"""Binary snapshots of the append-only text logs.
+
+A snapshot holds the entries of a log's first ``source_len`` bytes in
+columns: dates as day-ordinal deltas, whole numbers as ints and decimals
+as a scaled integer plus its number of decimal places, all zlib-compressed.
+Its header is the checkpoint: the inode, length and CRC32 of the text it
+covers, plus the CRC32 of the last few KiB of that text so a reader can
+check it still matches without reading the whole log. Readers decode the
+snapshot and parse only the text appended after the checkpoint.
+
+The text log stays the source of truth and is never rewritten. A
+snapshot is only written after decoding it reproduces the covered text
+byte for byte, and it replaces the old one atomically, so compaction can
+be interrupted at any point.
+"""
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import ContextManager, List, NamedTuple, Optional, Tuple
+from durable import write_cache
+from helpers import format_date_ordinal, parse_date_ordinal
+
+MAGIC = b"SWSNAP"
+VERSION = 1
+# magic, version, kind, source inode, source length, source CRC, tail CRC, entries
+HEADER = struct.Struct("<6sBBQQIII")
+TAIL_CHECK_SIZE = 4096
+
+DATE, INT, DECIMAL = "date", "int", "decimal"
+DECIMAL_RE = re.compile(rb"(0|[1-9][0-9]{0,11})(?:\.([0-9]{1,6}))?")
+POWERS = [10 ** i for i in range(7)]
+
+
+class LogLayout(NamedTuple):
+    """How a text log lays out its entries"""
+    kind: int
+    fields: Tuple[str, ...]
+    lines_per_entry: int  # 2 for weight/date pairs, 1 for comma-separated lines
+    trailing_newline: bool  # whether every entry ends with a newline
+
+
+# Usr/weight.txt: weight and date on alternating lines, no final newline
+WEIGHT_LAYOUT = LogLayout(1, (DECIMAL, DATE), 2, False)
+# Lifts/<name>.txt: one date,sets,reps,load line per entry
+LIFT_LAYOUT = LogLayout(2, (DATE, INT, INT, DECIMAL), 1, True)
+
+
+class Snapshot:
+    """Decoded columns of a snapshot and the length of text they cover"""
+
+    __slots__ = ("layout", "source_len", "columns")
+
+    def __init__(self, layout: LogLayout, source_len: int, columns: List[array]) -> None:
+        self.layout = layout
+        self.source_len = source_len
+        # DATE and INT fields have one array each; DECIMAL has mantissas then places
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def _column(self, field: int) -> int:
+        index = 0
+        for kind in self.layout.fields[:field]:
+            index += 2 if kind == DECIMAL else 1
+        return index
+
+    def ints(self, field: int) -> array:
+        """A DATE field as day ordinals, or an INT field"""
+        return self.columns[self._column(field)]
+
+    def floats(self, field: int) -> array:
+        """A DECIMAL field as floats"""
+        index = self._column(field)
+        return array('d', (m / POWERS[p] for m, p in zip(self.columns[index], self.columns[index + 1])))
+
+    def texts(self, field: int) -> List[str]:
+        """A field exactly as it was written in the log"""
+        kind = self.layout.fields[field]
+        index = self._column(field)
+        if kind == DATE:
+            return [format_date_ordinal(day) for day in self.columns[index]]
+        if kind == INT:
+            return [str(value) for value in self.columns[index]]
+        return [_format_decimal(m, p) for m, p in zip(self.columns[index], self.columns[index + 1])]
+
+    def text(self, field: int, index: int) -> str:
+        """One entry's field exactly as it was written in the log"""
+        kind = self.layout.fields[field]
+        column = self._column(field)
+        if kind == DATE:
+            return format_date_ordinal(self.columns[column][index])
+        if kind == INT:
+            return str(self.columns[column][index])
+        return _format_decimal(self.columns[column][index], self.columns[column + 1][index])
+
+    def render(self) -> bytes:
+        """The log text this snapshot covers"""
+        fields = [self.texts(i) for i in range(len(self.layout.fields))]
+        if self.layout.lines_per_entry == 1:
+            return "".join(",".join(entry) + "\n" for entry in zip(*fields)).encode()
+        return "\n".join(text for entry in zip(*fields) for text in entry).encode()
+
+
+def _format_decimal(mantissa: int, places: int) -> str:
+    if not places:
+        return str(mantissa)
+    digits = str(mantissa).rjust(places + 1, "0")
+    return f"{digits[:-places]}.{digits[-places:]}"
+
+
+def _parse_field(kind: str, text: bytes) -> Optional[Tuple[int, ...]]:
+    """Encoded value of a field, or None if it would not render back identically"""
+    if kind == DECIMAL:
+        match = DECIMAL_RE.fullmatch(text)
+        if match is None:
+            return None
+        places = len(match.group(2) or b"")
+        return (int(text.replace(b".", b"")), places)
+    try:
+        value = int(text) if kind == INT else parse_date_ordinal(text.decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+    rendered = str(value) if kind == INT else format_date_ordinal(value)
+    if rendered.encode() != text or not -2 ** 31 <= value < 2 ** 31:
+        return None
+    return (value,)
+
+
+def _split_entries(layout: LogLayout, data: bytes) -> Tuple[List[array], int]:
+    """Columns for the longest prefix of data written in the app's own format, and its length"""
+    columns: List[array] = []
+    for kind in layout.fields:
+        columns.extend([array('q'), array('B')] if kind == DECIMAL else [array('i')])
+    lines = data.split(b"\n")
+    # The last piece has no newline after it; a line-per-entry log has not finished it yet
+    complete = len(lines) - 1 if layout.trailing_newline else len(lines)
+    pos = 0
+    end = 0
+    i = 0
+    while i + layout.lines_per_entry <= complete:
+        if layout.lines_per_entry == 1:
+            texts = lines[i].split(b",")
+        else:
+            texts = lines[i:i + layout.lines_per_entry]
+        if len(texts) != len(layout.fields):
+            break
+        values = [_parse_field(kind, text) for kind, text in zip(layout.fields, texts)]
+        if any(value is None for value in values):
+            break
+        index = 0
+        for value in values:
+            for part in value:  # pyright: ignore[reportOptionalIterable]
+                columns[index].append(part)
+                index += 1
+        for line in lines[i:i + layout.lines_per_entry]:
+            pos += len(line) + 1
+        i += layout.lines_per_entry
+        end = pos if layout.trailing_newline else pos - 1
+    return columns, end
+
+
+def _encode(layout: LogLayout, columns: List[array], ino: int, source: bytes) -> bytes:
+    body = []
+    index = 0
+    for kind in layout.fields:
+        column = columns[index]
+        if kind == DATE:
+            # Logs are mostly in date order, so most deltas are small and compress well
+            column = array('i', (b - a for a, b in zip([0] + column.tolist(), column)))
+        body.append(column)
+        index += 1
+        if kind == DECIMAL:
+            body.append(columns[index])
+            index += 1
+    if sys.byteorder == "big":
+        body = [array(column.typecode, column) for column in body]
+        for column in body:
+            column.byteswap()
+    header = HEADER.pack(MAGIC, VERSION, layout.kind, ino, len(source), zlib.crc32(source),
+                         zlib.crc32(source[-TAIL_CHECK_SIZE:]), len(columns[0]) if columns else 0)
+    return header + zlib.compress(b"".join(column.tobytes() for column in body))
+
+
+def _decode(layout: LogLayout, data: bytes) -> Optional[Tuple[Tuple, Snapshot]]:
+    """(header fields, snapshot) from a snapshot file's bytes"""
+    if len(data) < HEADER.size:
+        return None
+    header = HEADER.unpack_from(data)
+    magic, version, kind, _, source_len, _, _, count = header
+    if magic != MAGIC or version != VERSION or kind != layout.kind:
+        return None
+    try:
+        body = zlib.decompress(data[HEADER.size:])
+    except zlib.error:
+        return None
+    columns: List[array] = []
+    pos = 0
+    for field in layout.fields:
+        for typecode in ("q", "B") if field == DECIMAL else ("i",):
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(body[pos:pos + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            if field == DATE:
+                column = array('i', accumulate(column))
+            columns.append(column)
+            pos += size
+    if pos != len(body):
+        return None
+    return header, Snapshot(layout, source_len, columns)
+
+
+def _claimed_length(layout: LogLayout, st: os.stat_result, snapshot_path: Path) -> int:
+    """Length of log text a snapshot says it covers, from its header alone; 0 if it cannot apply"""
+    try:
+        with open(snapshot_path, 'rb') as f:
+            data = f.read(HEADER.size)
+    except FileNotFoundError:
+        return 0
+    if len(data) < HEADER.size:
+        return 0
+    magic, version, kind, ino, source_len, _, _, _ = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION or kind != layout.kind:
+        return 0
+    if ino != st.st_ino or source_len > st.st_size:
+        return 0
+    return source_len
+
+
+def load(layout: LogLayout, log_file, snapshot_path: Path) -> Optional[Snapshot]:
+    """Snapshot of an open log, or None if there is none or it no longer matches"""
+    try:
+        with open(snapshot_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    decoded = _decode(layout, data)
+    if decoded is None:
+        return None
+    (_, _, _, ino, source_len, _, tail_crc, _), snapshot = decoded
+    st = os.fstat(log_file.fileno())
+    if st.st_ino != ino or st.st_size < source_len:
+        return None
+    start = max(0, source_len - TAIL_CHECK_SIZE)
+    if zlib.crc32(os.pread(log_file.fileno(), source_len - start, start)) != tail_crc:
+        return None
+    return snapshot
+
+
+def compact(layout: LogLayout, log_path: Path, snapshot_path: Path, lock: ContextManager,
+            min_new_bytes: int = 0) -> int:
+    """Write a snapshot of a log if enough has been appended since the last one.
+
+    The log's size is checked against the old snapshot's header first, so
+    a log that has not grown enough is never read. It is only read while
+    holding lock; encoding and the round-trip check happen outside it.
+    Returns how many entries the new snapshot covers, or 0 if none was
+    written.
+    """
+    with lock:
+        try:
+            with open(log_path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if st.st_size - _claimed_length(layout, st, snapshot_path) < max(min_new_bytes, 1):
+                    return 0
+                ino = st.st_ino
+                data = f.read()
+                current = load(layout, f, snapshot_path)
+        except FileNotFoundError:
+            return 0
+    # The header's claim may not have held up once checked
+    covered = current.source_len if current is not None else 0
+    if len(data) - covered < max(min_new_bytes, 1):
+        return 0
+
+    columns, end = _split_entries(layout, data)
+    if end <= covered:
+        return 0
+    source = data[:end]
+    encoded = _encode(layout, columns, ino, source)
+    decoded = _decode(layout, encoded)
+    if decoded is None or decoded[1].render() != source:
+        return 0
+    if not write_cache(snapshot_path, encoded):
+        return 0
+    return len(decoded[1])
@@ -1,7 +1,28 @@
-from app import *
+import argparse
+import config
 
 def main():
-    app = MyApp()
+    parser = argparse.ArgumentParser(description="Fitness tracker")
+    parser.add_argument("--profile", help="open this profile instead of asking")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and first-frame times, then exit")
+    parser.add_argument("--json", action="store_true",
+                        help="print the --profile-startup report as JSON")
+    parser.add_argument("--trace", nargs="?", const=config.TRACE_FILE, metavar="FILE",
+                        help="record I/O and handler timings to FILE (F12 shows live counters)")
+    args = parser.parse_args()
+
+    if args.trace:
+        import instrument
+        instrument.enable(args.trace)
+
+    if args.profile_startup:
+        from startup import profile_startup
+        profile_startup(args.profile, as_json=args.json)
+        return
+
+    from app import MyApp
+    app = MyApp(profile=args.profile)
     app.run()
 
 if __name__ == '__main__':
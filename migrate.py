@@ -0,0 +1,61 @@
+"""One-shot import of a _Swol_ text-file tree into the SQLite backend.
+
+Usage: python migrate.py [SOURCE_DIR] [DB_FILE]
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+import config
+from sqlite_storage import SqliteStorage
+from storage import FileStorage
+
+
+def migrate(src_dir: Path, db_file: Path) -> Dict[str, int]:
+    """Copy everything under src_dir into db_file in a single transaction"""
+    source = FileStorage(src_dir)
+    dest = SqliteStorage(db_file)
+    counts = {"weights": 0, "lifts": 0, "lift_entries": 0, "workouts": 0, "sessions": 0}
+    try:
+        with dest.transaction():
+            name = source.read_name()
+            if name:
+                dest.write_name(name)
+            goal = source.read_goal()
+            if goal:
+                dest.write_goal(goal)
+
+            counts["weights"] = dest.append_weights(source.weight_history())
+
+            lifts = source.list_lifts()
+            dest.add_lifts(lifts)
+            counts["lifts"] = len(lifts)
+            for lift in lifts:
+                for entry in source.lift_entries(lift):
+                    dest.append_lift(lift, *entry)
+                    counts["lift_entries"] += 1
+
+            for workout in source.list_workouts():
+                dest.write_workout(workout, source.read_workout(workout))
+                counts["workouts"] += 1
+
+            for session in source.list_sessions():
+                dest.append_session(session)
+                counts["sessions"] += 1
+    finally:
+        dest.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a _Swol_ directory into SQLite")
+    parser.add_argument("source", nargs="?", default=config.DB_DIR)
+    parser.add_argument("db_file", nargs="?", default=str(Path(config.DB_DIR) / config.SQLITE_FILE))
+    args = parser.parse_args()
+
+    counts = migrate(Path(args.source), Path(args.db_file))
+    print(f"Imported {counts['weights']} weights, {counts['lifts']} lifts "
+          f"({counts['lift_entries']} logged entries), {counts['workouts']} workouts "
+          f"and {counts['sessions']} sessions into {args.db_file}")
+
+if __name__ == '__main__':
+    main()
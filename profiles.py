@@ -0,0 +1,82 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Tuple
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: sessions are not locked against each other
+    fcntl = None
+
+
+def profile_path(profile: str = config.DEFAULT_PROFILE, db_dir: str = config.DB_DIR) -> Path:
+    """Directory holding a profile's data.
+
+    The default profile is the top-level DB_DIR so single-user installs
+    keep their existing layout; every other profile gets its own subtree.
+    """
+    if profile == config.DEFAULT_PROFILE:
+        return Path(db_dir)
+    return Path(db_dir) / config.PROFILES_DIR / profile
+
+
+def list_profiles(db_dir: str = config.DB_DIR) -> List[str]:
+    """Names of all profiles, without loading any of them"""
+    names = [config.DEFAULT_PROFILE]
+    try:
+        with os.scandir(Path(db_dir) / config.PROFILES_DIR) as entries:
+            names += sorted(entry.name for entry in entries if entry.is_dir())
+    except FileNotFoundError:
+        pass
+    return names
+
+
+def has_named_profiles(db_dir: str = config.DB_DIR) -> bool:
+    """Check if any profile besides the default one exists"""
+    try:
+        with os.scandir(Path(db_dir) / config.PROFILES_DIR) as entries:
+            return any(entry.is_dir() for entry in entries)
+    except FileNotFoundError:
+        return False
+
+
+def validate_profile_name(name: str) -> Tuple[bool, str]:
+    """Profile names become directory names, so keep them simple"""
+    name = name.strip()
+    if not name or name == config.DEFAULT_PROFILE:
+        return False, config.MSG_INVALID_PROFILE
+    if name.startswith(".") or any(c in name for c in '/\\:'):
+        return False, config.MSG_INVALID_PROFILE
+    return True, ""
+
+
+class ProfileLock:
+    """Advisory, re-entrant lock on a profile's lock file.
+
+    Held around every write so several TUI sessions on one profile take
+    turns instead of interleaving appends. Threads in this process are
+    serialised by an RLock; other processes by flock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = -1
+
+    def __enter__(self) -> "ProfileLock":
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd != -1:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = -1
+        self._thread_lock.release()
@@ -0,0 +1,68 @@
+import heapq
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+from textual import fuzzy
+
+CANCEL_CHECK_INTERVAL = 512
+
+
+class LiftSearchIndex:
+    """Fuzzy search over a fixed list of lift names.
+
+    ``fuzzy.Matcher`` only matches candidates that contain every letter of
+    the query, so a per-letter posting list is used to drop everything else
+    before scoring. When a query extends the previous one, only the lifts
+    that matched last time are rescored.
+    """
+
+    def __init__(self, lifts: Sequence[str]) -> None:
+        self.lifts = list(lifts)
+        self._postings: Dict[str, Set[int]] = {}
+        for i, lift in enumerate(self.lifts):
+            for letter in set(lift.lower()):
+                self._postings.setdefault(letter, set()).add(i)
+
+        # (query, indexes that matched it), swapped as one object so a
+        # search running on another thread never sees half an update
+        self._last: Tuple[str, List[int]] = ("", [])
+
+    def _candidates(self, query: str) -> List[int]:
+        """Indexes of lifts that contain every letter of the query"""
+        last_query, last_matches = self._last
+        if last_query and query.startswith(last_query):
+            letters = set(query) - set(last_query)
+            base = last_matches
+        else:
+            letters = set(query)
+            base = None
+
+        postings = sorted((self._postings.get(letter, set()) for letter in letters), key=len)
+        if base is None:
+            if not postings:
+                return list(range(len(self.lifts)))
+            smallest, rest = postings[0], postings[1:]
+            return sorted(i for i in smallest if all(i in p for p in rest))
+        return [i for i in base if all(i in p for p in postings)]
+
+    def search(self, query: str, limit: int,
+               cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[str]]:
+        """Best ``limit`` lifts for the query, highest score first.
+
+        Returns None if ``cancelled`` reports True part way through.
+        """
+        query = query.lower()
+        if not query:
+            return []
+
+        matcher = fuzzy.Matcher(query)
+        scored: List[Tuple[float, int]] = []
+        for n, i in enumerate(self._candidates(query)):
+            if cancelled is not None and n % CANCEL_CHECK_INTERVAL == 0 and cancelled():
+                return None
+            score = matcher.match(self.lifts[i])
+            if score > 0:
+                scored.append((score, i))
+
+        self._last = (query, [i for _, i in scored])
+
+        best = heapq.nlargest(limit, scored, key=lambda item: item[0])
+        return [self.lifts[i] for _, i in best]
@@ -0,0 +1,162 @@
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from durable import durable_append, file_stamp, write_cache
+from helpers import week_start_ordinal
+
+# (lift, sets, reps, load)
+SessionLift = Tuple[str, int, int, float]
+
+
+class Session:
+    """One performed workout: when it started, how long it took and what was lifted"""
+
+    __slots__ = ("workout", "started", "minutes", "lifts")
+
+    def __init__(self, workout: str, started: datetime, minutes: float,
+                 lifts: List[SessionLift]) -> None:
+        self.workout = workout
+        self.started = started
+        self.minutes = minutes
+        self.lifts = lifts
+
+    @property
+    def volume(self) -> float:
+        return sum(sets * reps * load for _, sets, reps, load in self.lifts)
+
+    def to_dict(self) -> Dict:
+        return {
+            "workout": self.workout,
+            "started": self.started.isoformat(timespec="seconds"),
+            "minutes": self.minutes,
+            "lifts": [list(lift) for lift in self.lifts],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Session":
+        return cls(data["workout"], datetime.fromisoformat(data["started"]), data["minutes"],
+                   [(lift, int(sets), int(reps), float(load)) for lift, sets, reps, load in data["lifts"]])
+
+
+class PeriodTotals:
+    """Sessions, volume and minutes trained in one week or month"""
+
+    __slots__ = ("sessions", "volume", "minutes")
+
+    def __init__(self, sessions: int = 0, volume: float = 0.0, minutes: float = 0.0) -> None:
+        self.sessions = sessions
+        self.volume = volume
+        self.minutes = minutes
+
+    def add(self, session: Session) -> None:
+        self.sessions += 1
+        self.volume += session.volume
+        self.minutes += session.minutes
+
+
+def month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+class Rollups:
+    """Per-week and per-month totals, folded in one session at a time.
+
+    Weeks are keyed by the day ordinal of their Monday and months by
+    ``YYYY-MM``, both taken from the session's start.
+    """
+
+    __slots__ = ("weekly", "monthly")
+
+    def __init__(self) -> None:
+        self.weekly: Dict[int, PeriodTotals] = {}
+        self.monthly: Dict[str, PeriodTotals] = {}
+
+    def add(self, session: Session) -> None:
+        day = session.started.date()
+        self.weekly.setdefault(week_start_ordinal(day.toordinal()), PeriodTotals()).add(session)
+        self.monthly.setdefault(month_key(day), PeriodTotals()).add(session)
+
+    def week(self, day: date) -> PeriodTotals:
+        """Totals for the week containing day"""
+        return self.weekly.get(week_start_ordinal(day.toordinal()), PeriodTotals())
+
+    def month(self, day: date) -> PeriodTotals:
+        """Totals for the month containing day"""
+        return self.monthly.get(month_key(day), PeriodTotals())
+
+    def to_dict(self) -> Dict:
+        return {
+            "weekly": {str(k): [t.sessions, t.volume, t.minutes] for k, t in self.weekly.items()},
+            "monthly": {k: [t.sessions, t.volume, t.minutes] for k, t in self.monthly.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Rollups":
+        rollups = cls()
+        rollups.weekly = {int(k): PeriodTotals(*v) for k, v in data.get("weekly", {}).items()}
+        rollups.monthly = {k: PeriodTotals(*v) for k, v in data.get("monthly", {}).items()}
+        return rollups
+
+
+class SessionLog:
+    """Append-only session log with a rollup cache beside it.
+
+    Sessions are stored one JSON object per line. The rollups are saved
+    with the size and mtime of the log they cover, updated on every append,
+    and rebuilt from the log only if it was changed behind our back.
+    """
+
+    def __init__(self, path: Path, rollups_path: Path, fsync: str = "never") -> None:
+        self.path = path
+        self.rollups_path = rollups_path
+        self.fsync = fsync
+        self._rollups: Optional[Rollups] = None
+        self._stamp_seen: Optional[str] = None
+
+    def sessions(self) -> List[Session]:
+        """Every recorded session, oldest first"""
+        try:
+            with open(self.path, 'r') as f:
+                return [Session.from_dict(json.loads(line)) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def rollups(self) -> Rollups:
+        """Weekly and monthly totals without reading the session log"""
+        stamp = file_stamp(self.path)
+        if self._rollups is not None and stamp == self._stamp_seen:
+            return self._rollups
+
+        rollups = self._read_rollups(stamp)
+        if rollups is None:
+            rollups = Rollups()
+            for session in self.sessions():
+                rollups.add(session)
+            self._write_rollups(rollups, stamp)
+        self._rollups, self._stamp_seen = rollups, stamp
+        return rollups
+
+    def append(self, session: Session) -> Rollups:
+        """Record a session and fold it into the rollups"""
+        rollups = self.rollups()
+        durable_append(self.path, json.dumps(session.to_dict()) + "\n", self.fsync)
+        rollups.add(session)
+        self._stamp_seen = file_stamp(self.path)
+        self._write_rollups(rollups, self._stamp_seen)
+        return rollups
+
+    def _read_rollups(self, stamp: Optional[str]) -> Optional[Rollups]:
+        try:
+            with open(self.rollups_path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get("stamp") != stamp:
+            return None
+        return Rollups.from_dict(data)
+
+    def _write_rollups(self, rollups: Rollups, stamp: Optional[str]) -> None:
+        if not stamp:
+            return
+        write_cache(self.rollups_path, json.dumps({"stamp": stamp, **rollups.to_dict()}))
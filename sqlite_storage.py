@@ -0,0 +1,403 @@
+import sqlite3
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+from helpers import parse_date_ordinal, week_start_ordinal
+from liftlog import LiftEntry, LiftStats
+from sessions import PeriodTotals, Rollups, Session, SessionLift, month_key
+from storage import Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day INTEGER NOT NULL UNIQUE,
+    date TEXT NOT NULL,
+    weight TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lifts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS workout_lifts (
+    workout_id INTEGER NOT NULL REFERENCES workouts(id) ON DELETE CASCADE,
+    lift_id INTEGER NOT NULL REFERENCES lifts(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (workout_id, lift_id)
+);
+CREATE INDEX IF NOT EXISTS workout_lifts_by_lift ON workout_lifts(lift_id);
+CREATE TABLE IF NOT EXISTS lift_sets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lift_id INTEGER NOT NULL REFERENCES lifts(id),
+    date TEXT NOT NULL,
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    load REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lift_sets_by_lift ON lift_sets(lift_id, id);
+CREATE TABLE IF NOT EXISTS lift_stats (
+    lift_id INTEGER PRIMARY KEY REFERENCES lifts(id),
+    entries INTEGER NOT NULL,
+    best_e1rm REAL NOT NULL,
+    best_e1rm_date TEXT NOT NULL,
+    top_load REAL NOT NULL,
+    top_reps INTEGER NOT NULL,
+    top_date TEXT NOT NULL,
+    total_volume REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lift_weekly_volume (
+    lift_id INTEGER NOT NULL REFERENCES lifts(id),
+    week INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (lift_id, week)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workout TEXT NOT NULL,
+    started TEXT NOT NULL,
+    minutes REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_lifts (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    lift_id INTEGER NOT NULL REFERENCES lifts(id),
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    load REAL NOT NULL,
+    PRIMARY KEY (session_id, position)
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    minutes REAL NOT NULL,
+    PRIMARY KEY (period, key)
+);
+"""
+
+# lift_stats columns, in LiftStats order
+STATS_COLUMNS = ("entries", "best_e1rm", "best_e1rm_date", "top_load", "top_reps",
+                 "top_date", "total_volume")
+
+
+class SqliteStorage(Storage):
+    """Single-file SQLite backend running in WAL mode.
+
+    Weight dates are stored as day ordinals next to the original string so
+    duplicate checks and range queries go through the unique index on day.
+    """
+
+    def __init__(self, db_file: Path) -> None:
+        self.db_file = db_file
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Writes may come from the write-behind thread; _lock keeps a
+        # transaction on one thread at a time
+        self.conn = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group statements into one commit; nested blocks join the outer one"""
+        with self._lock:
+            if self._depth == 0:
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("COMMIT")
+
+    def _get(self, key: str) -> str:
+        row = self.conn.execute("SELECT value FROM profile WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else ""
+
+    def _set(self, key: str, value: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO profile (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def has_profile(self) -> bool:
+        has_weight = self.conn.execute("SELECT 1 FROM weights LIMIT 1").fetchone()
+        return bool(self._get("name") and self._get("goal") and has_weight)
+
+    def read_name(self) -> str:
+        return self._get("name")
+
+    def write_name(self, name: str) -> None:
+        self._set("name", name)
+
+    def read_goal(self) -> str:
+        return self._get("goal")
+
+    def write_goal(self, target: str) -> None:
+        self._set("goal", target)
+
+    def has_weight(self, date_str: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM weights WHERE day = ?", (parse_date_ordinal(date_str),)).fetchone()
+        return row is not None
+
+    def latest_weight(self) -> Tuple[str, str]:
+        row = self.conn.execute(
+            "SELECT weight, date FROM weights ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return (row[0], row[1]) if row else ("", "")
+
+    def weight_history(self) -> List[Tuple[str, str]]:
+        return self.conn.execute("SELECT weight, date FROM weights ORDER BY id").fetchall()
+
+    def iter_weights(self, start: Optional[date] = None,
+                     end: Optional[date] = None) -> Iterator[Tuple[str, str]]:
+        # Rows come off the cursor as they are read rather than all at once
+        if start is None and end is None:
+            yield from self.conn.execute("SELECT weight, date FROM weights ORDER BY id")
+            return
+        lo = start.toordinal() if start is not None else date.min.toordinal()
+        hi = end.toordinal() if end is not None else date.max.toordinal()
+        yield from self.conn.execute(
+            "SELECT weight, date FROM weights WHERE day BETWEEN ? AND ? ORDER BY id", (lo, hi))
+
+    def weight_columns(self) -> Tuple[array, array]:
+        days, weights = array('i'), array('d')
+        for day, weight in self.conn.execute("SELECT day, weight FROM weights ORDER BY id"):
+            days.append(day)
+            weights.append(float(weight))
+        return days, weights
+
+    def weights_between(self, start: date, end: date) -> List[Tuple[str, str]]:
+        return self.conn.execute(
+            "SELECT weight, date FROM weights WHERE day BETWEEN ? AND ? ORDER BY day",
+            (start.toordinal(), end.toordinal()),
+        ).fetchall()
+
+    def append_weight(self, weight: str, date_str: str) -> bool:
+        return self.append_weights([(weight, date_str)]) == 1
+
+    def append_weights(self, entries: Iterable[Tuple[str, str]]) -> int:
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO weights (day, date, weight) VALUES (?, ?, ?)",
+                ((parse_date_ordinal(date_str), date_str, weight) for weight, date_str in entries),
+            )
+            return conn.total_changes - before
+
+    def reset_weights(self, weight: str, date_str: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM weights")
+            self.append_weight(weight, date_str)
+
+    def list_workouts(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT name FROM workouts ORDER BY name")]
+
+    def read_workout(self, name: str) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT lifts.name FROM workout_lifts "
+            "JOIN workouts ON workouts.id = workout_lifts.workout_id "
+            "JOIN lifts ON lifts.id = workout_lifts.lift_id "
+            "WHERE workouts.name = ? ORDER BY workout_lifts.position",
+            (name,),
+        )]
+
+    def write_workout(self, name: str, lifts: List[str]) -> None:
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO workouts (name) VALUES (?)", (name,))
+            workout_id = conn.execute("SELECT id FROM workouts WHERE name = ?", (name,)).fetchone()[0]
+            conn.execute("DELETE FROM workout_lifts WHERE workout_id = ?", (workout_id,))
+            conn.executemany("INSERT OR IGNORE INTO lifts (name) VALUES (?)", ((lift,) for lift in lifts))
+            conn.executemany(
+                "INSERT OR IGNORE INTO workout_lifts (workout_id, lift_id, position) "
+                "SELECT ?, id, ? FROM lifts WHERE name = ?",
+                ((workout_id, position, lift) for position, lift in enumerate(lifts)),
+            )
+
+    def read_workout_ids(self, name: str) -> List[int]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT lift_id FROM workout_lifts "
+            "JOIN workouts ON workouts.id = workout_lifts.workout_id "
+            "WHERE workouts.name = ? ORDER BY workout_lifts.position",
+            (name,),
+        )]
+
+    def write_workout_ids(self, name: str, lift_ids: Iterable[int]) -> None:
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO workouts (name) VALUES (?)", (name,))
+            workout_id = conn.execute("SELECT id FROM workouts WHERE name = ?", (name,)).fetchone()[0]
+            conn.execute("DELETE FROM workout_lifts WHERE workout_id = ?", (workout_id,))
+            conn.executemany(
+                "INSERT INTO workout_lifts (workout_id, lift_id, position) VALUES (?, ?, ?)",
+                ((workout_id, lift_id, position) for position, lift_id in enumerate(dict.fromkeys(lift_ids))),
+            )
+
+    def workouts_with_lifts(self, lifts: Iterable[str]) -> List[str]:
+        names = list(dict.fromkeys(lifts))
+        if not names:
+            return []
+        return [row[0] for row in self.conn.execute(
+            "SELECT workouts.name FROM workout_lifts "
+            "JOIN workouts ON workouts.id = workout_lifts.workout_id "
+            "JOIN lifts ON lifts.id = workout_lifts.lift_id "
+            f"WHERE lifts.name IN ({', '.join('?' * len(names))}) "
+            "GROUP BY workouts.id HAVING COUNT(*) = ? ORDER BY workouts.name",
+            (*names, len(names)),
+        )]
+
+    def lift_id(self, name: str) -> int:
+        lift_id = self._lift_id(name)
+        if lift_id is None:
+            with self.transaction() as conn:
+                conn.execute("INSERT OR IGNORE INTO lifts (name) VALUES (?)", (name,))
+                lift_id = self._lift_id(name)
+        return lift_id
+
+    def find_lift_id(self, name: str) -> Optional[int]:
+        return self._lift_id(name)
+
+    def lift_name(self, lift_id: int) -> Optional[str]:
+        row = self.conn.execute("SELECT name FROM lifts WHERE id = ?", (lift_id,)).fetchone()
+        return row[0] if row else None
+
+    def rename_lift(self, old: str, new: str) -> bool:
+        with self.transaction() as conn:
+            if self._lift_id(new) is not None or self._lift_id(old) is None:
+                return False
+            # Everything else refers to the lift by id
+            conn.execute("UPDATE lifts SET name = ? WHERE name = ?", (new, old))
+        return True
+
+    def add_lifts(self, names: Iterable[str]) -> None:
+        """Register lifts in the catalog"""
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO lifts (name) VALUES (?)", ((name,) for name in names))
+
+    def list_lifts(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT name FROM lifts ORDER BY name")]
+
+    def _lift_id(self, lift: str):
+        row = self.conn.execute("SELECT id FROM lifts WHERE name = ?", (lift,)).fetchone()
+        return row[0] if row else None
+
+    def append_lift(self, lift: str, date_str: str, sets: int, reps: int, load: float) -> LiftStats:
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO lifts (name) VALUES (?)", (lift,))
+            lift_id = self._lift_id(lift)
+            conn.execute(
+                "INSERT INTO lift_sets (lift_id, date, sets, reps, load) VALUES (?, ?, ?, ?, ?)",
+                (lift_id, date_str, sets, reps, load),
+            )
+            # Aggregates are kept in step inside the same transaction
+            stats = self.lift_stats(lift)
+            stats.add(date_str, sets, reps, load)
+            conn.execute(
+                f"INSERT OR REPLACE INTO lift_stats (lift_id, {', '.join(STATS_COLUMNS)}) "
+                f"VALUES (?{', ?' * len(STATS_COLUMNS)})",
+                (lift_id, *(getattr(stats, name) for name in STATS_COLUMNS)),
+            )
+            conn.execute(
+                "INSERT INTO lift_weekly_volume (lift_id, week, volume) VALUES (?, ?, ?) "
+                "ON CONFLICT(lift_id, week) DO UPDATE SET volume = volume + excluded.volume",
+                (lift_id, week_start_ordinal(parse_date_ordinal(date_str)), sets * reps * load),
+            )
+        return stats
+
+    def lift_entries(self, lift: str) -> List[LiftEntry]:
+        return self.conn.execute(
+            "SELECT date, sets, reps, load FROM lift_sets "
+            "WHERE lift_id = (SELECT id FROM lifts WHERE name = ?) ORDER BY id",
+            (lift,),
+        ).fetchall()
+
+    def lift_stats(self, lift: str) -> LiftStats:
+        stats = LiftStats()
+        lift_id = self._lift_id(lift)
+        if lift_id is None:
+            return stats
+        row = self.conn.execute(
+            f"SELECT {', '.join(STATS_COLUMNS)} FROM lift_stats WHERE lift_id = ?", (lift_id,)
+        ).fetchone()
+        if row is None:
+            return stats
+        for name, value in zip(STATS_COLUMNS, row):
+            setattr(stats, name, value)
+        stats.weekly_volume = dict(self.conn.execute(
+            "SELECT week, volume FROM lift_weekly_volume WHERE lift_id = ?", (lift_id,)
+        ).fetchall())
+        return stats
+
+    def append_session(self, session: Session) -> None:
+        day = session.started.date()
+        with self.transaction() as conn:
+            session_id = conn.execute(
+                "INSERT INTO sessions (workout, started, minutes) VALUES (?, ?, ?)",
+                (session.workout, session.started.isoformat(timespec="seconds"), session.minutes),
+            ).lastrowid
+            conn.executemany("INSERT OR IGNORE INTO lifts (name) VALUES (?)",
+                             ((lift,) for lift, *_ in session.lifts))
+            conn.executemany(
+                "INSERT INTO session_lifts (session_id, position, lift_id, sets, reps, load) "
+                "SELECT ?, ?, id, ?, ?, ? FROM lifts WHERE name = ?",
+                ((session_id, position, sets, reps, load, lift)
+                 for position, (lift, sets, reps, load) in enumerate(session.lifts)),
+            )
+            conn.executemany(
+                "INSERT INTO rollups (period, key, sessions, volume, minutes) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(period, key) DO UPDATE SET sessions = sessions + 1, "
+                "volume = volume + excluded.volume, minutes = minutes + excluded.minutes",
+                [("week", str(week_start_ordinal(day.toordinal())), session.volume, session.minutes),
+                 ("month", month_key(day), session.volume, session.minutes)],
+            )
+
+    def list_sessions(self) -> List[Session]:
+        lifts: Dict[int, List[SessionLift]] = {}
+        for session_id, lift, sets, reps, load in self.conn.execute(
+            "SELECT session_lifts.session_id, lifts.name, sets, reps, load FROM session_lifts "
+            "JOIN lifts ON lifts.id = session_lifts.lift_id ORDER BY session_id, position"
+        ):
+            lifts.setdefault(session_id, []).append((lift, sets, reps, load))
+        return [
+            Session(workout, datetime.fromisoformat(started), minutes, lifts.get(session_id, []))
+            for session_id, workout, started, minutes in self.conn.execute(
+                "SELECT id, workout, started, minutes FROM sessions ORDER BY id")
+        ]
+
+    def session_rollups(self) -> Rollups:
+        rollups = Rollups()
+        for period, key, sessions, volume, minutes in self.conn.execute(
+            "SELECT period, key, sessions, volume, minutes FROM rollups"
+        ):
+            totals = PeriodTotals(sessions, volume, minutes)
+            if period == "week":
+                rollups.weekly[int(key)] = totals
+            else:
+                rollups.monthly[key] = totals
+        return rollups
+
+    def batch(self) -> ContextManager[sqlite3.Connection]:
+        return self.transaction()
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,63 @@
+from datetime import datetime
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import Screen
+from textual.widgets import Button, Label, Input
+from textual.containers import Vertical, Horizontal, VerticalScroll
+from user import UsrData
+from writequeue import status_reporter
+
+
+class StartWorkout(Screen):
+    """Record a session of a saved workout, timed from when the screen opens"""
+
+    CSS_PATH = "start_workout.tcss"
+    BINDINGS = [
+        Binding(key="escape", action="go_back", description="Back"),
+    ]
+
+    def __init__(self, usr_info: UsrData, workout: str):
+        super().__init__()
+        self.usr_info = usr_info
+        self.workout = workout
+        self.lifts = usr_info.get_workout_lifts(workout)
+        self.started = datetime.now()
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll(id="session-container"):
+            yield Label(f"{self.workout} — started {self.started:%H:%M}", id="title")
+            with Vertical(id="session_lifts"):
+                # Row ids use the position so any lift name is safe
+                for i, lift in enumerate(self.lifts):
+                    with Horizontal(classes="session-row"):
+                        yield Label(lift, classes="lift-name")
+                        yield Input(placeholder="Sets", id=f"sets-{i}", type="integer")
+                        yield Input(placeholder="Reps", id=f"reps-{i}", type="integer")
+                        yield Input(placeholder="Load", id=f"load-{i}", type="number")
+            with Horizontal(id="button-container"):
+                yield Button("Finish Workout", variant="success", id="finish")
+                yield Button("Back", variant="default", id="back")
+            yield Label("", id="status")
+
+    def _entries(self) -> list[tuple[str, str, str, str]]:
+        """(lift, sets, reps, load) for every row the user filled in"""
+        entries = []
+        for i, lift in enumerate(self.lifts):
+            values = [self.query_one(f"#{field}-{i}", Input).value.strip()
+                      for field in ("sets", "reps", "load")]
+            if any(values):
+                entries.append((lift, *values))
+        return entries
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "finish":
+            success, msg = self.usr_info.record_session(self.workout, self.started, self._entries(),
+                                                        status_reporter(self))
+            self.query_one("#status", Label).update(msg)
+            if success:
+                self.query_one("#finish", Button).disabled = True
+        elif event.button.id == "back":
+            self.action_go_back()
+
+    def action_go_back(self) -> None:
+        self.app.pop_screen()
@@ -0,0 +1,80 @@
+"""Cold-start profiler behind ``python main.py --profile-startup``.
+
+Times each module import on the startup path in dependency order, so each
+figure is that module's own cost, then runs the app headless to measure
+time to the first frame. Each lazily loaded screen is then opened once to
+time its import and its first frame.
+"""
+import importlib
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Dependencies come before the modules that import them
+STARTUP_MODULES = ["config", "helpers", "storage", "user", "textual.app", "textual.widgets", "app"]
+SCREEN_MODULES = [
+    ("updateWeight", "UpdateWeight"),
+    ("logLift", "LogLift"),
+    ("createWorkouts", "CreateWorkouts"),
+    ("workoutBrowser", "WorkoutBrowser"),
+]
+
+
+def _timed_import(name: str) -> float:
+    """Milliseconds spent importing a module (0 if something already did)"""
+    if name in sys.modules:
+        return 0.0
+    start = time.perf_counter()
+    importlib.import_module(name)
+    return (time.perf_counter() - start) * 1000
+
+
+def profile_startup(profile: Optional[str] = None, as_json: bool = False) -> Dict:
+    """Run the app once headless and report where cold-start time goes"""
+    start = time.perf_counter()
+    report: Dict = {
+        "imports": [{"module": name, "ms": _timed_import(name)} for name in STARTUP_MODULES],
+        "first_frame_ms": None,
+        "screens": [],
+    }
+
+    import config
+    from app import MyApp
+    app = MyApp(profile=profile)
+
+    async def auto_pilot(pilot) -> None:
+        await pilot.pause()
+        report["first_frame_ms"] = (time.perf_counter() - start) * 1000
+
+        screens: List[Dict] = report["screens"]
+        # The profile picker opens nothing, so fall back to the default profile
+        usr_info = app.usr_info or app.switch_profile(config.DEFAULT_PROFILE)
+        for module_name, class_name in SCREEN_MODULES:
+            opened = time.perf_counter()
+            import_ms = _timed_import(module_name)
+            screen_cls = getattr(sys.modules[module_name], class_name)
+            await app.push_screen(screen_cls(usr_info))
+            await pilot.pause()
+            screens.append({
+                "screen": class_name,
+                "import_ms": import_ms,
+                "first_frame_ms": (time.perf_counter() - opened) * 1000,
+            })
+            app.pop_screen()
+            await pilot.pause()
+        app.exit()
+
+    app.run(headless=True, auto_pilot=auto_pilot)
+
+    if as_json:
+        print(json.dumps(report))
+    else:
+        for item in report["imports"]:
+            print(f"import  {item['module']:<20} {item['ms']:8.1f} ms")
+        if report["first_frame_ms"] is not None:
+            print(f"first frame {'':<16} {report['first_frame_ms']:8.1f} ms")
+        for item in report["screens"]:
+            print(f"screen  {item['screen']:<20} {item['import_ms']:8.1f} ms import "
+                  f"{item['first_frame_ms']:8.1f} ms to first frame")
+    return report
@@ -0,0 +1,437 @@
+import os
+from abc import ABC, abstractmethod
+from array import array
+from datetime import date
+from pathlib import Path
+from contextlib import nullcontext
+from typing import ContextManager, Iterable, Iterator, List, Optional, Tuple
+import config
+from catalog import Catalog
+from durable import WriteLayer
+from helpers import parse_date_ordinal
+from liftids import LiftRegistry
+from liftlog import LiftEntry, LiftLog, LiftStats
+from sessions import Rollups, Session, SessionLog
+from profiles import ProfileLock
+from weightlog import WeightLog
+from workoutindex import WorkoutIndex
+
+
+class Storage(ABC):
+    """Persistence backend behind UsrData.
+
+    Backends only store and fetch values; validation stays in UsrData.
+    Weight entries are (weight, date) string tuples in the order they
+    were logged.
+    """
+
+    @abstractmethod
+    def has_profile(self) -> bool:
+        """Check if name, weight and goal have all been saved"""
+
+    @abstractmethod
+    def read_name(self) -> str:
+        """Get the saved username"""
+
+    @abstractmethod
+    def write_name(self, name: str) -> None:
+        """Save the username"""
+
+    @abstractmethod
+    def read_goal(self) -> str:
+        """Get the saved target weight"""
+
+    @abstractmethod
+    def write_goal(self, target: str) -> None:
+        """Save the target weight"""
+
+    @abstractmethod
+    def has_weight(self, date_str: str) -> bool:
+        """Check if a weight is logged for the given date"""
+
+    @abstractmethod
+    def latest_weight(self) -> Tuple[str, str]:
+        """Get the most recently logged (weight, date) entry"""
+
+    @abstractmethod
+    def weight_history(self) -> List[Tuple[str, str]]:
+        """Get every logged (weight, date) entry"""
+
+    @abstractmethod
+    def append_weight(self, weight: str, date_str: str) -> bool:
+        """Log one weight entry, returning False if the date is already logged"""
+
+    @abstractmethod
+    def append_weights(self, entries: Iterable[Tuple[str, str]]) -> int:
+        """Log many weight entries in one write, returning how many were written"""
+
+    @abstractmethod
+    def reset_weights(self, weight: str, date_str: str) -> None:
+        """Replace the weight history with a single entry"""
+
+    @abstractmethod
+    def list_workouts(self) -> List[str]:
+        """Get the names of all saved workouts"""
+
+    @abstractmethod
+    def read_workout(self, name: str) -> List[str]:
+        """Get the current names of the lifts in a saved workout"""
+
+    @abstractmethod
+    def read_workout_ids(self, name: str) -> List[int]:
+        """Get the IDs of the lifts in a saved workout"""
+
+    @abstractmethod
+    def write_workout(self, name: str, lifts: List[str]) -> None:
+        """Save a workout from lift names, replacing any workout with the same name"""
+
+    @abstractmethod
+    def write_workout_ids(self, name: str, lift_ids: Iterable[int]) -> None:
+        """Save a workout from lift IDs, dropping repeats"""
+
+    @abstractmethod
+    def workouts_with_lifts(self, lifts: Iterable[str]) -> List[str]:
+        """Get the saved workouts that include every one of the lifts"""
+
+    @abstractmethod
+    def lift_id(self, name: str) -> int:
+        """Get a lift's stable ID, assigning one if it has none yet"""
+
+    @abstractmethod
+    def find_lift_id(self, name: str) -> Optional[int]:
+        """Get a lift's stable ID, or None if it has not been given one yet"""
+
+    @abstractmethod
+    def lift_name(self, lift_id: int) -> Optional[str]:
+        """Get a lift's current name from its ID, or None if the ID is unknown"""
+
+    @abstractmethod
+    def rename_lift(self, old: str, new: str) -> bool:
+        """Rename a lift everywhere, returning False if old is unknown or new is already taken"""
+
+    @abstractmethod
+    def list_lifts(self) -> List[str]:
+        """Get the names of all known lifts"""
+
+    @abstractmethod
+    def append_lift(self, lift: str, date_str: str, sets: int, reps: int, load: float) -> LiftStats:
+        """Log sets of a lift, adding the lift if it is new, and return its updated aggregates"""
+
+    @abstractmethod
+    def lift_entries(self, lift: str) -> List[LiftEntry]:
+        """Get every (date, sets, reps, load) entry logged for a lift"""
+
+    @abstractmethod
+    def lift_stats(self, lift: str) -> LiftStats:
+        """Get a lift's aggregates without scanning its log"""
+
+    @abstractmethod
+    def append_session(self, session: Session) -> None:
+        """Record a performed workout and add it to the rollups"""
+
+    @abstractmethod
+    def list_sessions(self) -> List[Session]:
+        """Get every recorded session, oldest first"""
+
+    @abstractmethod
+    def session_rollups(self) -> Rollups:
+        """Get weekly and monthly totals without scanning the sessions"""
+
+    def iter_weights(self, start: Optional[date] = None,
+                     end: Optional[date] = None) -> Iterator[Tuple[str, str]]:
+        """Yield entries lazily, optionally only those dated from start to end inclusive"""
+        lo = start.toordinal() if start is not None else date.min.toordinal()
+        hi = end.toordinal() if end is not None else date.max.toordinal()
+        for weight, date_str in self.weight_history():
+            if lo <= parse_date_ordinal(date_str) <= hi:
+                yield weight, date_str
+
+    def weights_between(self, start: date, end: date) -> List[Tuple[str, str]]:
+        """Get entries dated from start to end inclusive"""
+        return list(self.iter_weights(start, end))
+
+    def weight_columns(self) -> Tuple[array, array]:
+        """Get (day ordinals, weights) arrays for every entry, in the order logged"""
+        days, weights = array('i'), array('d')
+        for weight, date_str in self.weight_history():
+            days.append(parse_date_ordinal(date_str))
+            weights.append(float(weight))
+        return days, weights
+
+    def compact(self) -> int:
+        """Snapshot logs that have grown so later loads replay less; returns how many were written"""
+        return 0
+
+    def batch(self) -> ContextManager[None]:
+        """Commit every write made inside the block together"""
+        return nullcontext()
+
+    def flush(self) -> None:
+        """Make sure every accepted write has reached storage"""
+
+    def close(self) -> None:
+        """Release any resources held by the backend"""
+
+
+class FileStorage(Storage):
+    """The original _Swol_ layout: one small text file per value"""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self.usr_path = self.db_path / config.USR_DIR
+        self.workouts_path = self.db_path / config.WORKOUTS_DIR
+        self.usr_name_path = self.usr_path / config.NAME_FILE
+        self.usr_weight_path = self.usr_path / config.WEIGHT_FILE
+        self.usr_goal_weight_path = self.usr_path / config.GOAL_FILE
+        self.lifts_path = self.db_path / config.LIFTS_DIR
+        self.snap_path = self.db_path / config.SNAPSHOT_DIR
+
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self.usr_path.mkdir(parents=True, exist_ok=True)
+        self.workouts_path.mkdir(parents=True, exist_ok=True)
+        self.lifts_path.mkdir(parents=True, exist_ok=True)
+
+        self.lock = ProfileLock(self.db_path / config.LOCK_FILE)
+        self.writer = WriteLayer(lock=self.lock)
+        self.weight_log = WeightLog(self.usr_weight_path,
+                                    self.usr_path / config.WEIGHT_SNAPSHOT_FILE,
+                                    self.writer.fsync,
+                                    self.usr_path / config.WEIGHT_ZONES_FILE,
+                                    self.snap_path / config.WEIGHT_SNAP_FILE)
+        self.workouts_catalog = Catalog(self.workouts_path,
+                                        self.db_path / (config.WORKOUTS_DIR + config.MANIFEST_SUFFIX))
+        self.lifts_catalog = Catalog(self.lifts_path,
+                                     self.db_path / (config.LIFTS_DIR + config.MANIFEST_SUFFIX))
+        self.session_log = SessionLog(self.usr_path / config.SESSIONS_FILE,
+                                      self.usr_path / config.ROLLUPS_FILE,
+                                      self.writer.fsync)
+        self.lift_ids = LiftRegistry(self.db_path / config.LIFT_IDS_FILE, self.writer.fsync)
+        self.workout_index = WorkoutIndex(self.workouts_path,
+                                          self.db_path / (config.WORKOUTS_DIR + config.INDEX_SUFFIX),
+                                          self.read_workout_ids, self._workout_pending)
+        self.lift_log = LiftLog(self.db_path / (config.LIFTS_DIR + config.LIFT_STATS_SUFFIX),
+                                self.writer.fsync, self.snap_path / config.LIFTS_DIR)
+        self._closed = False
+
+    def _workout_pending(self, name: str) -> bool:
+        return self.writer.pending(self.workouts_catalog.path(name)) is not None
+
+    def _exists(self, path: Path) -> bool:
+        return self.writer.pending(path) is not None or path.exists()
+
+    def _read_first_line(self, path: Path) -> str:
+        pending = self.writer.pending(path)
+        if pending is not None:
+            return pending.split("\n", 1)[0].strip()
+        if not path.exists():
+            return ""
+        with open(path, 'r') as f:
+            return f.readline().strip()
+
+    def _weight_log(self) -> WeightLog:
+        """The weight log, once a reset still held by the write layer has reached its file.
+
+        Inside a batch this commits the batch early, so read weights after it instead.
+        """
+        if self.writer.pending(self.usr_weight_path) is not None:
+            self.writer.flush()
+        return self.weight_log
+
+    def has_profile(self) -> bool:
+        return (self._exists(self.usr_name_path) and
+                self._exists(self.usr_weight_path) and
+                self._exists(self.usr_goal_weight_path))
+
+    def read_name(self) -> str:
+        return self._read_first_line(self.usr_name_path)
+
+    def write_name(self, name: str) -> None:
+        self.writer.write(self.usr_name_path, name)
+
+    def read_goal(self) -> str:
+        return self._read_first_line(self.usr_goal_weight_path)
+
+    def write_goal(self, target: str) -> None:
+        self.writer.write(self.usr_goal_weight_path, target)
+
+    def has_weight(self, date_str: str) -> bool:
+        return self._weight_log().has_date(date_str)
+
+    def latest_weight(self) -> Tuple[str, str]:
+        return self._weight_log().latest()
+
+    def weight_history(self) -> List[Tuple[str, str]]:
+        return self._weight_log().entries()
+
+    def iter_weights(self, start: Optional[date] = None,
+                     end: Optional[date] = None) -> Iterator[Tuple[str, str]]:
+        return self._weight_log().iter_entries(start, end)
+
+    def weight_columns(self) -> Tuple[array, array]:
+        return self._weight_log().columns()
+
+    def compact(self) -> int:
+        # Logs are only read under the lock, so writers wait just for that read
+        written = 1 if self._weight_log().compact(self.lock) else 0
+        for lift in self.lifts_catalog.names:
+            if self._closed:
+                # The profile was closed, e.g. switched away from, while this ran
+                break
+            if self.lift_log.compact(self.lifts_catalog.path(lift), self.lock):
+                written += 1
+        return written
+
+    def append_weight(self, weight: str, date_str: str) -> bool:
+        weight_log = self._weight_log()
+        with self.lock:
+            weight_log.sync()
+            if weight_log.has_date(date_str):
+                return False
+            weight_log.append(weight, date_str)
+            return True
+
+    def append_weights(self, entries: Iterable[Tuple[str, str]]) -> int:
+        weight_log = self._weight_log()
+        with self.lock:
+            weight_log.sync()
+            return weight_log.extend(entries)
+
+    def reset_weights(self, weight: str, date_str: str) -> None:
+        # A whole-file write like the name and goal, so a batch commits all three together
+        with self.lock:
+            self.writer.write(self.usr_weight_path, f"{weight}\n{date_str}")
+            self.weight_log.invalidate()
+
+    def list_workouts(self) -> List[str]:
+        return self.workouts_catalog.names
+
+    def _read_workout_lines(self, name: str) -> List[str]:
+        f_name = self.workouts_catalog.path(name)
+        data = self.writer.pending(f_name)
+        if data is None:
+            if not f_name.exists():
+                return []
+            with open(f_name, 'r') as f:
+                data = f.read()
+        return [line.strip() for line in data.split("\n") if line.strip()]
+
+    def read_workout(self, name: str) -> List[str]:
+        lines = self._read_workout_lines(name)
+        if lines and lines[0] == config.WORKOUT_IDS_HEADER:
+            self.lift_ids.sync()
+            return [self.lift_ids.name_for(int(lift_id)) or f"#{lift_id}" for lift_id in lines[1:]]
+        # Older workouts list lift names; map any that were renamed since
+        return [self.lift_ids.resolve(lift) for lift in lines]
+
+    def read_workout_ids(self, name: str) -> List[int]:
+        lines = self._read_workout_lines(name)
+        if lines and lines[0] == config.WORKOUT_IDS_HEADER:
+            return [int(lift_id) for lift_id in lines[1:]]
+        with self.lock:
+            return self.lift_ids.intern(self.lift_ids.resolve(lift) for lift in lines)
+
+    def write_workout(self, name: str, lifts: List[str]) -> None:
+        with self.lock:
+            lift_ids = self.lift_ids.intern(lifts)
+        self.write_workout_ids(name, lift_ids)
+
+    def write_workout_ids(self, name: str, lift_ids: Iterable[int]) -> None:
+        unique = dict.fromkeys(lift_ids)
+        data = "\n".join([config.WORKOUT_IDS_HEADER, *map(str, unique)])
+        f_name = self.workouts_catalog.path(name)
+        self.writer.write(f_name, data)
+        self.workouts_catalog.add(name)
+        self.workout_index.update(name, unique)
+
+    def workouts_with_lifts(self, lifts: Iterable[str]) -> List[str]:
+        # Reading new or edited workouts may give their lifts IDs
+        self.workout_index.refresh()
+        self.lift_ids.sync()
+        lift_ids = [self.lift_ids.id_for(lift) for lift in lifts]
+        if None in lift_ids:
+            return []
+        return self.workout_index.containing_all(lift_ids)  # pyright: ignore[reportArgumentType]
+
+    def lift_id(self, name: str) -> int:
+        self.lift_ids.sync()
+        lift_id = self.lift_ids.id_for(name)
+        if lift_id is None:
+            with self.lock:
+                lift_id = self.lift_ids.intern([name])[0]
+        return lift_id
+
+    def find_lift_id(self, name: str) -> Optional[int]:
+        self.lift_ids.sync()
+        return self.lift_ids.id_for(name)
+
+    def lift_name(self, lift_id: int) -> Optional[str]:
+        self.lift_ids.sync()
+        return self.lift_ids.name_for(lift_id)
+
+    def rename_lift(self, old: str, new: str) -> bool:
+        with self.lock:
+            self.lift_ids.sync()
+            if self.lift_ids.id_for(new) is not None or self.lifts_catalog.path(new).exists():
+                return False
+            old_path = self.lifts_catalog.path(old)
+            lift_id = self.lift_ids.id_for(old)
+            if lift_id is None:
+                if not old_path.exists():
+                    return False
+                # Logged before lifts had IDs
+                lift_id = self.lift_ids.intern([old])[0]
+            self.lift_ids.rename(lift_id, new)
+            if old_path.exists():
+                # Its log moves with it; the catalog sees the directory change
+                os.replace(old_path, self.lifts_catalog.path(new))
+                old_snap = self.lift_log.snap_path(old_path)
+                if old_snap is not None and old_snap.exists():
+                    os.replace(old_snap, self.lift_log.snap_path(self.lifts_catalog.path(new)))  # pyright: ignore[reportArgumentType]
+                old_cache = self.lift_log.cache_path(old_path)
+                if old_cache.exists():
+                    os.replace(old_cache, self.lift_log.cache_path(self.lifts_catalog.path(new)))
+        return True
+
+    def list_lifts(self) -> List[str]:
+        return self.lifts_catalog.names
+
+    def append_lift(self, lift: str, date_str: str, sets: int, reps: int, load: float) -> LiftStats:
+        with self.lock:
+            stats = self.lift_log.append(lift, self.lifts_catalog.path(lift), date_str, sets, reps, load)
+        if lift not in self.lifts_catalog:
+            self.lifts_catalog.add(lift)
+        return stats
+
+    def lift_entries(self, lift: str) -> List[LiftEntry]:
+        return self.lift_log.entries(self.lifts_catalog.path(lift))
+
+    def lift_stats(self, lift: str) -> LiftStats:
+        return self.lift_log.stats(lift, self.lifts_catalog.path(lift))
+
+    def append_session(self, session: Session) -> None:
+        with self.lock:
+            self.session_log.append(session)
+
+    def list_sessions(self) -> List[Session]:
+        return self.session_log.sessions()
+
+    def session_rollups(self) -> Rollups:
+        return self.session_log.rollups()
+
+    def batch(self) -> ContextManager[None]:
+        return self.writer.batch()
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self._closed = True
+        self.writer.close()
+
+
+def open_storage(db_path: Path) -> Storage:
+    """Open the backend selected by config.STORAGE_BACKEND"""
+    if config.STORAGE_BACKEND == "sqlite":
+        from sqlite_storage import SqliteStorage
+        return SqliteStorage(db_path / config.SQLITE_FILE)
+    return FileStorage(db_path)
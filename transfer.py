@@ -0,0 +1,121 @@
+"""Streaming bulk import/export of weight history as CSV or JSONL.
+
+Usage: python transfer.py import FILE
+       python transfer.py export FILE
+"""
+import argparse
+import csv
+import json
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+import config
+from helpers import parse_date_ordinal
+from user import UsrData
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path: Path, fmt: Optional[str] = None) -> str:
+    """Use the given format, or guess it from the file extension"""
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt == "json":
+        fmt = "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def read_rows(path: Path, fmt: str) -> Iterator[Tuple[str, str]]:
+    """Yield (weight, date) string pairs from a file without loading it whole"""
+    with open(path, 'r', newline='') as f:
+        if fmt == "csv":
+            for row in csv.reader(f):
+                if len(row) < 2:
+                    yield "", ""
+                elif row[0].strip().lower() == "weight":
+                    continue
+                else:
+                    yield row[0].strip(), row[1].strip()
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    yield str(record["weight"]).strip(), str(record["date"]).strip()
+                except (ValueError, KeyError, TypeError):
+                    yield "", ""
+
+
+def import_weights(usr_info: UsrData, path: Path, fmt: Optional[str] = None) -> Dict[str, int]:
+    """Validate every row and log the new ones with a single write.
+
+    Rows are checked with the same rules as manual entry. Dates already in
+    the history, or repeated in the file, are skipped.
+    """
+    fmt = detect_format(path, fmt)
+    seen = set(usr_info.get_weight_history().days)
+    counts = {"imported": 0, "duplicates": 0, "invalid": 0}
+    entries = []
+
+    rows = read_rows(path, fmt)
+    while batch := list(islice(rows, config.IMPORT_BATCH_SIZE)):
+        for weight, date_str in batch:
+            if not usr_info.validate_weight(weight)[0]:
+                counts["invalid"] += 1
+                continue
+            # Same DATE_FORMAT rule as validate_date, without a second parse
+            try:
+                day = parse_date_ordinal(date_str)
+            except ValueError:
+                counts["invalid"] += 1
+                continue
+            if day in seen:
+                counts["duplicates"] += 1
+                continue
+            seen.add(day)
+            entries.append((weight, date.fromordinal(day).strftime(config.DATE_FORMAT)))
+
+    counts["imported"] = usr_info.add_weights(entries)
+    return counts
+
+
+def export_weights(usr_info: UsrData, path: Path, fmt: Optional[str] = None) -> int:
+    """Write the weight history to a file one row at a time"""
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, 'w', newline='') as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["weight", "date"])
+            for weight, date_str in usr_info.iter_weight_history():
+                writer.writerow([weight, date_str])
+                count += 1
+        else:
+            for weight, date_str in usr_info.iter_weight_history():
+                f.write(json.dumps({"weight": weight, "date": date_str}) + "\n")
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import or export weight history")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=FORMATS)
+    args = parser.parse_args()
+
+    usr_info = UsrData()
+    path = Path(args.file)
+    if args.action == "import":
+        counts = import_weights(usr_info, path, args.format)
+        print(f"Imported {counts['imported']} entries "
+              f"({counts['duplicates']} duplicates, {counts['invalid']} invalid rows skipped)")
+    else:
+        count = export_weights(usr_info, path, args.format)
+        print(f"Exported {count} entries to {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Headless keystroke-to-paint latency for the Textual screens.
+
+    python ui_bench.py --sizes 1000,100000 > ui_results.jsonl
+
+Drives MyApp through ``App.run_test`` against a generated data directory
+(see bench.py for how sizes map to catalog sizes) and replays scripted
+input:
+
+* search: each key typed into CreateWorkouts' ``#search``, timed until the
+  results rows show that query's matches and the screen has repainted.
+  This includes the search debounce, since the user waits for it too.
+* update_weight: pressing Update in UpdateWeight, timed until the status
+  and current-weight labels have been refreshed.
+
+Results are printed in the same JSON-lines format as bench.py. Figures
+include the pilot's own event round-trips, so compare them between runs
+rather than reading them as absolute latencies.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+import config
+from bench import SEARCH_QUERIES, build_dataset, commit_id, summarize
+
+SCREEN_SIZE = (100, 40)
+WAIT_TIMEOUT = 10.0
+
+
+async def _wait_for(pilot, done: Callable[[], bool]) -> None:
+    """Let the app run until done() holds, then until it has repainted"""
+    deadline = time.perf_counter() + WAIT_TIMEOUT
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("UI did not settle")
+        await asyncio.sleep(0)
+        await pilot.pause()
+    await pilot.pause()
+
+
+async def _bench_search(app, pilot, repeat: int) -> List[float]:
+    from createWorkouts import CreateWorkouts
+
+    await pilot.click("#add_workout")
+    await pilot.pause()
+    screen = app.screen
+    assert isinstance(screen, CreateWorkouts)
+
+    # Record which query the rows were last filled for
+    shown = {"query": ""}
+    show_results = screen._show_results
+
+    def recording_show_results(matches: list[str]) -> None:
+        show_results(matches)
+        shown["query"] = search.value
+
+    screen._show_results = recording_show_results  # pyright: ignore[reportAttributeAccessIssue]
+    search = screen.query_one("#search")
+    search.focus()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        for query in SEARCH_QUERIES:
+            search.value = ""  # pyright: ignore[reportAttributeAccessIssue]
+            await _wait_for(pilot, lambda: shown["query"] == "")
+            for end in range(1, len(query) + 1):
+                start = time.perf_counter()
+                await pilot.press("space" if query[end - 1] == " " else query[end - 1])
+                await _wait_for(pilot, lambda: shown["query"] == query[:end])
+                samples.append((time.perf_counter() - start) * 1000)
+
+    app.pop_screen()
+    await pilot.pause()
+    return samples
+
+
+async def _bench_update_weight(app, pilot, repeat: int) -> List[float]:
+    from textual.widgets import Button, Input, Label
+
+    await pilot.click("#update_weight")
+    await pilot.pause()
+    screen = app.screen
+    status = screen.query_one("#status", Label)
+    update = screen.query_one("#update", Button)
+
+    samples: List[float] = []
+    day = date.today()
+    for i in range(repeat):
+        screen.query_one("#new_weight", Input).value = "200"
+        screen.query_one("#date", Input).value = (day + timedelta(days=i)).strftime(config.DATE_FORMAT)
+        status.update("")
+        # A button ignores clicks while its pressed animation is still running
+        await _wait_for(pilot, lambda: not update.has_class("-active"))
+
+        start = time.perf_counter()
+        await pilot.click("#update")
+        await _wait_for(pilot, lambda: str(status.content) == config.MSG_WEIGHT_UPDATED)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    app.pop_screen()
+    await pilot.pause()
+    return samples
+
+
+async def run_size(root: Path, size: int, repeat: int) -> List[Dict]:
+    from app import MyApp
+
+    app = MyApp(db_dir=str(root / config.DB_DIR))
+    async with app.run_test(headless=True, size=SCREEN_SIZE) as pilot:
+        await pilot.pause()
+        search = await _bench_search(app, pilot, repeat)
+        update = await _bench_update_weight(app, pilot, repeat * 10)
+    return [summarize("ui.search_keystroke", size, search),
+            summarize("ui.update_weight", size, update)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless UI latency at several data sizes")
+    parser.add_argument("--sizes", default="1000,100000", help="comma-separated weight-entry counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    meta = {
+        "commit": commit_id(),
+        "python": platform.python_version(),
+        "backend": config.STORAGE_BACKEND,
+        "fsync": config.FSYNC_POLICY,
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            build_dataset(root, size, args.seed)
+            print(f"size {size}: running UI script", file=sys.stderr)
+            for result in asyncio.run(run_size(root, size, args.repeat)):
+                print(json.dumps({**result, **meta}), flush=True)
+
+if __name__ == "__main__":
+    main()
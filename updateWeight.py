@@ -1,13 +1,9 @@
-from textual.app import App, ComposeResult
-from textual.binding import Binding
-from textual.theme import Theme
 from textual.screen import Screen
-from textual.widgets import Button, Label, Input, ListView, ListItem, Static, option_list
-from textual.containers import Vertical, Horizontal, VerticalScroll
-from textual import fuzzy
+from textual.widgets import Button, Label, Input
+from textual.containers import Vertical
 from user import UsrData
-from datetime import date
 import config
+from writequeue import status_reporter
 
 class UpdateWeight(Screen):
     def __init__(self, usr_info: UsrData):
@@ -34,7 +30,7 @@ class UpdateWeight(Screen):
                 status_label.update(config.MSG_WEIGHT_REQUIRED)  # pyright: ignore[reportAttributeAccessIssue]
                 return
             
-            success, msg = self.usr_info.update_weight(new_weight, date_value)
+            success, msg = self.usr_info.update_weight(new_weight, date_value, status_reporter(self))
             status_label.update(msg)  # pyright: ignore[reportAttributeAccessIssue]
             
             if success:
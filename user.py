@@ -1,43 +1,131 @@
+import threading
+from array import array
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, date
-from typing import Optional, Dict, Tuple, List
+from typing import Any, Callable, Optional, Dict, Iterable, Iterator, Tuple, List
 import config
+from helpers import parse_date_ordinal
+from storage import Storage, open_storage
+from history import WeightHistory
+from liftlog import LiftEntry, LiftStats
+from sessions import Rollups, Session
+from profiles import profile_path
+from writequeue import ErrorCallback, WriteQueue
 
 class UsrData:
-    def __init__(self) -> None:
-        self.db_path = Path(config.DB_DIR)
-        self.usr_path = self.db_path / config.USR_DIR
-        self.workouts_path = self.db_path / config.WORKOUTS_DIR
-        self.usr_name_path = self.usr_path / config.NAME_FILE
-        self.usr_weight_path = self.usr_path / config.WEIGHT_FILE
-        self.usr_goal_weight_path = self.usr_path / config.GOAL_FILE
-        self.lifts_path = self.db_path / config.LIFTS_DIR
-        
-        self.db_path.mkdir(parents=True, exist_ok=True)
-        self.usr_path.mkdir(parents=True, exist_ok=True)
-        self.workouts_path.mkdir(parents=True, exist_ok=True)
-        self.lifts_path.mkdir(parents=True, exist_ok=True)
-        
+    def __init__(self, db_dir: str = config.DB_DIR, storage: Optional[Storage] = None,
+                 profile: str = config.DEFAULT_PROFILE, write_behind: bool = False) -> None:
+        self.profile = profile
+        self.db_path = profile_path(profile, db_dir)
+        self.store: Storage = storage if storage is not None else open_storage(self.db_path)
+        # With write-behind, saves are queued and the in-memory values are
+        # updated straight away; failures go to the caller's on_error
+        self.write_queue: Optional[WriteQueue] = WriteQueue() if write_behind else None
+        # Queued writes as (storage method, args) until they have run, so
+        # reads can include them instead of waiting for the queue to drain
+        self._queued: List[Tuple[Callable[..., Any], tuple]] = []
+        # Held while a write runs and while a read looks at storage and the
+        # queue, so a read waits for at most one write
+        self._lock = threading.RLock()
+        # Queued weights storage turned down, which the analytics may already hold
+        self._failed_weights = 0
+        self._failed_weights_seen = 0
+
         self.usr_name: str = ""
         self.usr_weight: str = ""
         self.usr_target: str = ""
-        
-        self.workouts_dic: Dict[str, Path] = {}
-        self.workouts = []
-        for item in self.workouts_path.iterdir():
-            if item.is_file():
-                self.workouts_dic[item.stem] = item
-                self.workouts.append(item.stem)
-
-        self.lifts_dic:Dict[str, Path] = {}
-        self.lifts = []
-        for item in self.lifts_path.iterdir():
-            if item.is_file():
-                self.lifts_dic[item.stem] = item
-                self.lifts.append(item.stem)
-
-    
-    def validate_weight(self, weight: str) -> Tuple[bool, str]:
+        self._analytics = None
+
+    def _write(self, on_error: Optional[ErrorCallback], fn: Callable[..., Any], *args) -> Any:
+        """Run a storage write now, or queue it when write-behind is on"""
+        if self.write_queue is None:
+            with self._lock:
+                return fn(*args)
+        job = (fn, args)
+        with self._lock:
+            self._queued.append(job)
+        self.write_queue.submit(self._run_queued, job, on_error=on_error)
+        return None
+
+    def _run_queued(self, job: Tuple[Callable[..., Any], tuple]) -> Any:
+        fn, args = job
+        with self._lock:
+            try:
+                return fn(*args)
+            finally:
+                # Storage has it now, or it failed and on_error hears about it
+                self._queued.remove(job)
+
+    def _pending(self, fn: Callable[..., Any]) -> List[tuple]:
+        """Arguments of the queued calls to fn, oldest first; call with _lock held"""
+        return [args for queued, args in self._queued if queued == fn]
+
+    def _pending_weights(self) -> Tuple[bool, List[Tuple[str, str]]]:
+        """Whether a queued reset replaces the weight log, and the entries queued since"""
+        reset, entries = False, []
+        for fn, args in self._queued:
+            if fn == self.store.reset_weights:
+                reset, entries = True, [args]
+            elif fn == self._append_weight:
+                entries.append(args)
+        return reset, entries
+
+    def _pending_workouts(self) -> Dict[str, List[str]]:
+        """Lift names of each workout with a queued save, newest save winning"""
+        workouts: Dict[str, List[str]] = {}
+        for fn, args in self._queued:
+            if fn == self.store.write_workout:
+                workouts[args[0]] = list(dict.fromkeys(args[1]))
+            elif fn == self.store.write_workout_ids:
+                workouts[args[0]] = [self.store.lift_name(lift_id) or f"#{lift_id}"
+                                     for lift_id in dict.fromkeys(args[1])]
+        return workouts
+
+    def _settle(self) -> Storage:
+        """Storage once every queued write has run, for the writes that must follow them.
+
+        This waits for the queue, so never call it from the UI thread.
+        """
+        if self.write_queue is not None:
+            self.write_queue.flush()
+        return self.store
+
+    @contextmanager
+    def _locked_batch(self) -> Iterator[None]:
+        with self._lock, self.store.batch():
+            yield
+
+    @property
+    def analytics(self):
+        """WeightAnalytics over the full history, built on first use"""
+        with self._lock:
+            if self._failed_weights != self._failed_weights_seen:
+                self._failed_weights_seen = self._failed_weights
+                self._analytics = None
+            if self._analytics is None:
+                from analytics import WeightAnalytics
+                self._analytics = WeightAnalytics(self.get_weight_history())
+            return self._analytics
+
+    @property
+    def workouts(self) -> List[str]:
+        """Saved workout names, loaded on first use"""
+        with self._lock:
+            names = self.store.list_workouts()
+            new = set(self._pending_workouts()) - set(names)
+        return sorted(names + list(new)) if new else names
+
+    @property
+    def lifts(self) -> List[str]:
+        """Known lift names, loaded on first use"""
+        with self._lock:
+            names = self.store.list_lifts()
+            new = {args[0] for args in self._pending(self.store.append_lift)} - set(names)
+        return sorted(names + list(new)) if new else names
+    
+    @staticmethod
+    def validate_weight(weight: str) -> Tuple[bool, str]:
         """Validate weight is a number within reasonable bounds"""
         try:
             w = float(weight)
@@ -56,49 +144,58 @@ class UsrData:
         except ValueError:
             return False, config.MSG_INVALID_DATE
     
+    @staticmethod
+    def validate_login(name: str, weight: str, target: str) -> Tuple[bool, str]:
+        """Validate a whole login form before anything is written, or any profile opened"""
+        if not name.strip():
+            return False, config.MSG_NAME_REQUIRED
+        valid, msg = UsrData.validate_weight(weight)
+        if not valid:
+            return False, msg
+        return UsrData.validate_weight(target)
+    
     def has_weight_for_date(self, date_str: str) -> bool:
         """Check if weight already exists for given date"""
-        if not self.usr_weight_path.exists():
-            return False
-        
-        with open(self.usr_weight_path, 'r') as f:
-            lines = [line.strip() for line in f.readlines() if line.strip()]
-        
-        for i in range(1, len(lines), 2):
-            if lines[i] == date_str:
+        with self._lock:
+            reset, entries = self._pending_weights()
+            if any(logged == date_str for _, logged in entries):
                 return True
-        return False
+            return not reset and self.store.has_weight(date_str)
     
     def need_login(self) -> bool:
         """Check if user needs to login"""
-        return not (self.usr_name_path.exists() and 
-                   self.usr_weight_path.exists() and 
-                   self.usr_goal_weight_path.exists())
+        with self._lock:
+            if self.store.has_profile():
+                return False
+            # A login that is still queued counts
+            return not all(self._pending(fn) for fn in
+                           (self.store.write_name, self.store.reset_weights, self.store.write_goal))
     
-    def write_usr_name(self, name: str) -> Tuple[bool, str]:
+    def write_usr_name(self, name: str, on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
         """Write username to file"""
         if not name.strip():
             return False, config.MSG_NAME_REQUIRED
         
-        with open(self.usr_name_path, 'w') as f:
-            f.write(name.strip())
+        self._write(on_error, self.store.write_name, name.strip())
         self.usr_name = name.strip()
         return True, ""
     
-    def write_usr_weight_first(self, weight: str) -> Tuple[bool, str]:
+    def write_usr_weight_first(self, weight: str,
+                               on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
         """Write initial weight (for first login)"""
         valid, msg = self.validate_weight(weight)
         if not valid:
             return False, msg
         
         date_str = date.today().strftime(config.DATE_FORMAT)
-        full_str = f"{weight}\n{date_str}"
-        with open(self.usr_weight_path, 'w') as f:
-            f.write(full_str)
+        with self._lock:
+            self._write(on_error, self.store.reset_weights, weight, date_str)
+            self._analytics = None
         self.usr_weight = weight
         return True, ""
     
-    def write_usr_weight(self, weight: str, date_str: str = "") -> Tuple[bool, str]:
+    def write_usr_weight(self, weight: str, date_str: str = "",
+                         on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
         """Add new weight entry"""
         valid, msg = self.validate_weight(weight)
         if not valid:
@@ -114,69 +211,100 @@ class UsrData:
         if self.has_weight_for_date(date_str):
             return False, config.MSG_DUPLICATE_DATE
         
-        full_str = f"\n{weight}\n{date_str}"
-        with open(self.usr_weight_path, 'a') as f:
-            f.write(full_str)
+        with self._lock:
+            result = self._write(on_error, self._append_weight, weight, date_str)
+            if result is not None and not result[0]:
+                return result
+            # Updated here rather than by the write so only the caller's thread touches it
+            if self._analytics is not None:
+                self._analytics.append(weight, date_str)
         
         self.usr_weight = weight
         return True, config.MSG_WEIGHT_UPDATED
     
-    def write_usr_target_weight(self, target: str) -> Tuple[bool, str]:
+    def _append_weight(self, weight: str, date_str: str) -> Tuple[bool, str]:
+        # Another session may have logged this date since the check in write_usr_weight
+        if not self.store.append_weight(weight, date_str):
+            self._failed_weights += 1
+            return False, config.MSG_DUPLICATE_DATE
+        return True, ""
+    
+    def add_weights(self, entries: List[Tuple[str, str]]) -> int:
+        """Log many already-validated (weight, date) entries in one write"""
+        if not entries:
+            return 0
+        store = self._settle()
+        with self._lock:
+            count = store.append_weights(entries)
+            self.usr_weight, _ = store.latest_weight()
+            self._analytics = None
+        return count
+    
+    def write_usr_target_weight(self, target: str,
+                                on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
         """Write target weight"""
         valid, msg = self.validate_weight(target)
         if not valid:
             return False, msg
         
-        with open(self.usr_goal_weight_path, 'w') as f:
-            f.write(target)
+        self._write(on_error, self.store.write_goal, target)
         self.usr_target = target
         return True, ""
     
-    def update_weight(self, weight: str, date_str: str = "") -> Tuple[bool, str]:
+    def update_weight(self, weight: str, date_str: str = "",
+                      on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
         """Update weight (single source of truth)"""
-        return self.write_usr_weight(weight, date_str)
+        return self.write_usr_weight(weight, date_str, on_error)
     
     def get_name(self) -> str:
         """Get username from file"""
-        if not self.usr_name_path.exists():
-            return ""
-        with open(self.usr_name_path, 'r') as f:
-            return f.readline().strip()
+        with self._lock:
+            queued = self._pending(self.store.write_name)
+            return queued[-1][0] if queued else self.store.read_name()
     
     def get_weight(self) -> str:
         """Get most recent weight"""
-        if not self.usr_weight_path.exists():
-            return ""
-        
-        weight = ""
-        with open(self.usr_weight_path, 'r') as f:
-            count = 0
-            for line in f:
-                if count % 2 == 0:  
-                    weight = line.strip()
-                count += 1
+        with self._lock:
+            _, entries = self._pending_weights()
+            weight, _ = entries[-1] if entries else self.store.latest_weight()
         return weight
     
     def get_goal_weight(self) -> str:
         """Get target weight"""
-        if not self.usr_goal_weight_path.exists():
-            return ""
-        with open(self.usr_goal_weight_path, 'r') as f:
-            return f.readline().strip()
-    
-    def get_weight_history(self) -> List[Tuple[str, str]]:
-        """Get all weight entries as list of (weight, date) tuples"""
-        if not self.usr_weight_path.exists():
-            return []
-        
-        with open(self.usr_weight_path, 'r') as f:
-            lines = [line.strip() for line in f.readlines() if line.strip()]
-        
-        history = []
-        for i in range(0, len(lines), 2):
-            if i + 1 < len(lines):
-                history.append((lines[i], lines[i + 1]))
-        return history
+        with self._lock:
+            queued = self._pending(self.store.write_goal)
+            return queued[-1][0] if queued else self.store.read_goal()
+    
+    def iter_weight_history(self, start: Optional[date] = None,
+                            end: Optional[date] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (weight, date) entries in the order they were logged, optionally within a date range"""
+        if self.write_queue is None:
+            yield from self.store.iter_weights(start, end)
+            return
+        # Read in one go so the write-behind thread is not held up while the caller iterates
+        with self._lock:
+            reset, queued = self._pending_weights()
+            entries = [] if reset else list(self.store.iter_weights(start, end))
+        lo = start.toordinal() if start is not None else date.min.toordinal()
+        hi = end.toordinal() if end is not None else date.max.toordinal()
+        yield from entries
+        for weight, date_str in queued:
+            if lo <= parse_date_ordinal(date_str) <= hi:
+                yield weight, date_str
+    
+    def get_weight_history(self) -> WeightHistory:
+        """Get all weight entries in date order"""
+        with self._lock:
+            reset, queued = self._pending_weights()
+            days, weights = (array('i'), array('d')) if reset else self.store.weight_columns()
+        for weight, date_str in queued:
+            days.append(parse_date_ordinal(date_str))
+            weights.append(float(weight))
+        return WeightHistory.from_columns(days, weights)
+    
+    def get_weight_range(self, start: date, end: date) -> WeightHistory:
+        """Get weight entries dated from start to end inclusive"""
+        return WeightHistory.from_entries(self.iter_weight_history(start, end))
     
     def set_starting_vals(self) -> None:
         """Initialize values from files"""
@@ -184,6 +312,18 @@ class UsrData:
         self.usr_weight = self.get_weight()
         self.usr_target = self.get_goal_weight()
     
+    def get_weight_trend(self) -> Tuple[Optional[float], Optional[date]]:
+        """Get the weekly rate of change and projected goal date, None where there is too little data"""
+        with self._lock:
+            analytics = self.analytics
+            if len(analytics) < 2:
+                return None, None
+            try:
+                projected = analytics.projected_goal_date(float(self.usr_target))
+            except ValueError:
+                projected = None
+            return analytics.weekly_rate(), projected
+    
     def get_weight_difference(self) -> float:
         """Calculate difference between current and target weight"""
         try:
@@ -192,10 +332,177 @@ class UsrData:
             return 0.0
 
 
-    def write_workout(self,workout:str,lifts:list[str]):
-        lifts_str = "\n".join(lifts).strip()
-        workout = workout + ".txt"
-        f_name = self.workouts_path / workout
-        with open(f_name, 'w') as f:
-            f.write(lifts_str)
+    def compact(self) -> int:
+        """Snapshot the logs so later loads only parse what was appended since"""
+        return self.store.compact()
+
+    def batch(self):
+        """Group the writes made inside the block into one commit"""
+        if self.write_queue is not None:
+            return self.write_queue.batch(self._locked_batch)
+        return self.store.batch()
+
+    def close(self) -> None:
+        """Flush pending writes and release storage"""
+        if self.write_queue is not None:
+            self.write_queue.close()
+        self.store.close()
+
+    def validate_lift_name(self, lift: str) -> Tuple[bool, str]:
+        """Lift names become file names, so keep them simple"""
+        lift = lift.strip()
+        if not lift:
+            return False, config.MSG_LIFT_REQUIRED
+        if lift.startswith(".") or any(c in lift for c in '/\\'):
+            return False, config.MSG_INVALID_LIFT
+        return True, ""
+
+    def validate_lift_sets(self, sets: str, reps: str, load: str) -> Tuple[bool, str]:
+        """Validate sets and reps are positive whole numbers and load is in range"""
+        try:
+            if int(sets) < 1 or int(reps) < 1:
+                return False, config.MSG_INVALID_SETS
+        except (ValueError, TypeError):
+            return False, config.MSG_INVALID_SETS
+        try:
+            if not 0 <= float(load) <= config.MAX_LOAD:
+                return False, config.MSG_INVALID_LOAD
+        except (ValueError, TypeError):
+            return False, config.MSG_INVALID_LOAD
+        return True, ""
+
+    def log_lift(self, lift: str, sets: str, reps: str, load: str, date_str: str = "",
+                 on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
+        """Log sets of a lift and update its PR and volume aggregates"""
+        valid, msg = self.validate_lift_name(lift)
+        if not valid:
+            return False, msg
+        valid, msg = self.validate_lift_sets(sets, reps, load)
+        if not valid:
+            return False, msg
+
+        if not date_str:
+            date_str = date.today().strftime(config.DATE_FORMAT)
+        valid, msg = self.validate_date(date_str)
+        if not valid:
+            return False, msg
+
+        self._write(on_error, self.store.append_lift,
+                    lift.strip(), date_str, int(sets), int(reps), float(load))
+        return True, config.MSG_LIFT_LOGGED
+
+    def record_session(self, workout: str, started: datetime,
+                       entries: List[Tuple[str, str, str, str]],
+                       on_error: Optional[ErrorCallback] = None) -> Tuple[bool, str]:
+        """Save a performed workout from (lift, sets, reps, load) rows.
+
+        Each row is also logged against its lift, so PRs and weekly volume
+        pick up what was done in the session. SQLite saves it all in one
+        transaction. The file backend appends to several logs instead, so
+        the session, the record of what was done, goes first. A crash part
+        way through can then leave a session missing some lift entries,
+        never lift entries without their session. The rollups are built
+        from sessions alone and stay right either way.
+        """
+        if not entries:
+            return False, config.MSG_SESSION_EMPTY
+        for lift, sets, reps, load in entries:
+            valid, msg = self.validate_lift_sets(sets, reps, load)
+            if not valid:
+                return False, f"{lift}: {msg}"
+
+        lifts = [(lift, int(sets), int(reps), float(load)) for lift, sets, reps, load in entries]
+        minutes = round(max(0.0, (datetime.now() - started).total_seconds() / 60), 2)
+        session = Session(workout, started, minutes, lifts)
+        date_str = started.strftime(config.DATE_FORMAT)
+        with self.batch():
+            self._write(on_error, self.store.append_session, session)
+            for lift in lifts:
+                self._write(on_error, self.store.append_lift, lift[0], date_str, *lift[1:])
+        return True, config.MSG_SESSION_SAVED.format(minutes=session.minutes, volume=session.volume)
+
+    def get_sessions(self) -> List[Session]:
+        """Get every recorded workout session, oldest first"""
+        with self._lock:
+            return self.store.list_sessions() + [args[0] for args in self._pending(self.store.append_session)]
+
+    def get_rollups(self) -> Rollups:
+        """Get precomputed weekly and monthly training totals"""
+        with self._lock:
+            rollups = self.store.session_rollups()
+            queued = [args[0] for args in self._pending(self.store.append_session)]
+        if queued:
+            # Storage may hand back its cached copy
+            rollups = Rollups.from_dict(rollups.to_dict())
+            for session in queued:
+                rollups.add(session)
+        return rollups
+
+    def get_lift_stats(self, lift: str) -> LiftStats:
+        """Get best e1RM, top set and weekly volume for a lift"""
+        with self._lock:
+            stats = self.store.lift_stats(lift)
+            queued = [args[1:] for args in self._pending(self.store.append_lift) if args[0] == lift]
+        if queued:
+            stats = LiftStats.from_dict(stats.to_dict())
+            for entry in queued:
+                stats.add(*entry)
+        return stats
+
+    def get_lift_entries(self, lift: str) -> List[LiftEntry]:
+        """Get every logged entry for a lift, oldest first"""
+        with self._lock:
+            return self.store.lift_entries(lift) + [
+                args[1:] for args in self._pending(self.store.append_lift) if args[0] == lift]
+
+    def get_workout_lifts(self, workout: str) -> List[str]:
+        """Get the lifts in a saved workout"""
+        with self._lock:
+            queued = self._pending_workouts().get(workout)
+            return queued if queued is not None else self.store.read_workout(workout)
+
+    def write_workout(self,workout:str,lifts:list[str],on_error:Optional[ErrorCallback]=None):
+        self._write(on_error, self.store.write_workout, workout, lifts)
+
+    def get_workout_lift_ids(self, workout: str) -> List[int]:
+        """Get the IDs of the lifts in a saved workout"""
+        with self._lock:
+            for fn, args in reversed(self._queued):
+                if fn == self.store.write_workout_ids and args[0] == workout:
+                    return list(dict.fromkeys(args[1]))
+                if fn == self.store.write_workout and args[0] == workout:
+                    return list(dict.fromkeys(self.store.lift_id(lift) for lift in args[1]))
+            return self.store.read_workout_ids(workout)
+
+    def write_workout_ids(self, workout: str, lift_ids: Iterable[int],
+                          on_error: Optional[ErrorCallback] = None) -> None:
+        """Save a workout from lift IDs"""
+        self._write(on_error, self.store.write_workout_ids, workout, list(lift_ids))
+
+    def get_lift_id(self, lift: str) -> Optional[int]:
+        """Get a lift's stable ID, or None until a saved workout or log gives it one"""
+        with self._lock:
+            return self.store.find_lift_id(lift)
+
+    def rename_lift(self, old: str, new: str) -> Tuple[bool, str]:
+        """Rename a lift without touching the workouts that use it"""
+        valid, msg = self.validate_lift_name(new)
+        if not valid:
+            return False, msg
+        store = self._settle()
+        with self._lock:
+            renamed = store.rename_lift(old.strip(), new.strip())
+        if not renamed:
+            return False, config.MSG_LIFT_NOT_RENAMED
+        return True, config.MSG_LIFT_RENAMED
 
+    def find_workouts(self, lifts: Iterable[str]) -> List[str]:
+        """Get the saved workouts that include all of the given lifts"""
+        wanted = [lift.strip() for lift in lifts if lift.strip()]
+        with self._lock:
+            found = self.store.workouts_with_lifts(wanted)
+            queued = self._pending_workouts()
+        if not queued:
+            return found
+        return sorted([name for name in found if name not in queued] +
+                      [name for name, names in queued.items() if wanted and set(wanted) <= set(names)])
@@ -0,0 +1,383 @@
+import json
+import mmap
+import os
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import config
+import logsnapshot
+from durable import durable_append, file_id, file_stamp, write_cache
+from helpers import parse_date_ordinal
+
+TAIL_BLOCK_SIZE = 4096
+READ_CHUNK_SIZE = 1 << 16
+
+# (start offset, end offset, earliest day ordinal, latest day ordinal)
+Zone = Tuple[int, int, int, int]
+
+
+class WeightLog:
+    """Append-only weight log stored as alternating weight/date lines.
+
+    The date index is built from the file the first time it is needed and then kept up to date by every append, so
+    duplicate checks never touch the file again. The latest entry is also
+    mirrored into a small sidecar file so it can be read at startup without
+    loading the log. Once ``compact()`` has written a binary snapshot, the
+    index takes the snapshot's day ordinals as they are and ``columns()``
+    takes dates and weights from it; both only parse the text appended
+    after it.
+    """
+
+    def __init__(self, path: Path, snapshot_path: Optional[Path] = None,
+                 fsync: str = "never", zones_path: Optional[Path] = None,
+                 snap_path: Optional[Path] = None) -> None:
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.zones_path = zones_path
+        self.snap_path = snap_path
+        self.fsync = fsync
+        self._dates: Set[str] = set()
+        self._days: Set[int] = set()
+        self._count = 0
+        self._last: Tuple[str, str] = ("", "")
+        self._loaded = False
+        # (inode, size) of the file as of our last read or write
+        self._seen: Tuple[int, int] = (0, 0)
+        self._zone_map: Optional[Dict] = None
+
+    def _load(self) -> None:
+        """Read the existing log once and index every entry by date"""
+        self._dates = set()
+        self._days = set()
+        self._count = 0
+        self._last = ("", "")
+        self._seen = (0, 0)
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            f = None
+        if f is not None:
+            with f:
+                snap = self._read_snap(f)
+                start = 0
+                if snap is not None and len(snap):
+                    self._days = set(snap.ints(1))
+                    self._count = len(snap)
+                    self._last = (snap.text(0, -1), snap.text(1, -1))
+                    start = snap.source_len
+                    f.seek(start)
+                data = f.read()
+                self._seen = (os.fstat(f.fileno()).st_ino, start + len(data))
+            self._index_lines(data)
+        self._loaded = True
+
+    def _read_snap(self, f) -> Optional[logsnapshot.Snapshot]:
+        if self.snap_path is None:
+            return None
+        return logsnapshot.load(logsnapshot.WEIGHT_LAYOUT, f, self.snap_path)
+
+    def _index_lines(self, data: bytes) -> None:
+        lines = [line.strip() for line in data.decode().split("\n") if line.strip()]
+        for i in range(0, len(lines) - 1, 2):
+            self._index(lines[i], lines[i + 1])
+
+    def sync(self) -> None:
+        """Pick up entries another session appended since we last looked.
+
+        Call with the profile lock held so the file cannot change mid-read.
+        """
+        if not self._loaded:
+            return
+        ino, size = file_id(self.path)
+        seen_ino, seen_size = self._seen
+        if (ino, size) == self._seen:
+            return
+        if ino != seen_ino or size < seen_size:
+            # Replaced or truncated, e.g. a reset from another session
+            self._load()
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(seen_size)
+            data = f.read()
+        self._seen = (ino, seen_size + len(data))
+        self._index_lines(data)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def _index(self, weight: str, date_str: str) -> None:
+        self._dates.add(date_str)
+        self._count += 1
+        self._last = (weight, date_str)
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return self._count
+
+    def has_date(self, date_str: str) -> bool:
+        """Check if an entry already exists for the given date"""
+        self._ensure_loaded()
+        return self._seen_date(date_str)
+
+    def _seen_date(self, date_str: str) -> bool:
+        # Dates parsed from text are kept as written; snapshot dates as ordinals
+        if date_str in self._dates:
+            return True
+        return bool(self._days) and parse_date_ordinal(date_str) in self._days
+
+    def weight_on(self, date_str: str) -> Optional[str]:
+        """Get the weight logged for a date, if any"""
+        day = date.fromordinal(parse_date_ordinal(date_str))
+        weight = None
+        for weight, _ in self.iter_entries(day, day):
+            pass
+        return weight
+
+    def entries(self) -> List[Tuple[str, str]]:
+        """Get all entries as (weight, date) tuples in file order"""
+        return list(self.iter_entries())
+
+    def columns(self) -> Tuple[array, array]:
+        """(day ordinals, weights) of every entry in file order, straight from the snapshot where there is one"""
+        days, weights = array('i'), array('d')
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return days, weights
+        with f:
+            snap = self._read_snap(f)
+            if snap is not None:
+                days, weights = snap.ints(1), snap.floats(0)
+                f.seek(snap.source_len)
+            lines = [line.strip() for line in f.read().split(b"\n") if line.strip()]
+        for i in range(0, len(lines) - 1, 2):
+            days.append(parse_date_ordinal(lines[i + 1].decode()))
+            weights.append(float(lines[i]))
+        return days, weights
+
+    def compact(self, lock: ContextManager) -> int:
+        """Snapshot the log if enough was appended since the last snapshot; returns entries covered"""
+        if self.snap_path is None:
+            return 0
+        self.snap_path.parent.mkdir(parents=True, exist_ok=True)
+        return logsnapshot.compact(logsnapshot.WEIGHT_LAYOUT, self.path, self.snap_path, lock,
+                                   config.COMPACT_MIN_BYTES)
+
+    def iter_entries(self, start: Optional[date] = None,
+                     end: Optional[date] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (weight, date) entries in file order, optionally only those from start to end.
+
+        The log is memory-mapped and read one zone at a time. Entries may be
+        logged out of date order, so a bounded query checks every zone's
+        date range and skips the zones that cannot overlap.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if st.st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if start is None and end is None:
+                    yield from self._read_zone(mm, 0, len(mm), None, None)
+                    return
+                lo = start.toordinal() if start is not None else date.min.toordinal()
+                hi = end.toordinal() if end is not None else date.max.toordinal()
+                for zone_start, zone_end, first, last in self._zones(mm, st):
+                    if first <= hi and last >= lo:
+                        yield from self._read_zone(mm, zone_start, zone_end, lo, hi)
+
+    def _read_zone(self, mm: mmap.mmap, start: int, end: int,
+                   lo: Optional[int], hi: Optional[int]) -> Iterator[Tuple[str, str]]:
+        weight: Optional[bytes] = None
+        pos = start
+        while pos < end:
+            # Split a chunk at a time, cut at a line break, so only that much is copied
+            cut = mm.find(b"\n", min(pos + READ_CHUNK_SIZE, end), end)
+            stop = end if cut == -1 else cut + 1
+            for line in mm[pos:stop].split(b"\n"):
+                line = line.strip()
+                if not line:
+                    continue
+                if weight is None:
+                    weight = line
+                    continue
+                date_str = line.decode()
+                if lo is not None:
+                    try:
+                        day = parse_date_ordinal(date_str)
+                    except ValueError:
+                        day = None
+                    if day is None or not lo <= day <= hi:  # pyright: ignore[reportOperatorIssue]
+                        weight = None
+                        continue
+                yield weight.decode(), date_str
+                weight = None
+            pos = stop
+
+    def _zones(self, mm: mmap.mmap, st: os.stat_result) -> List[Zone]:
+        """Zone map for the mapped log, extended or rebuilt if the log changed.
+
+        Saved beside the log with the inode, size and mtime it covers. The
+        log is append-only, so when only the size has grown the last zone is
+        re-read together with whatever was appended after it.
+        """
+        stamp = [st.st_ino, len(mm), st.st_mtime_ns]
+        saved = self._zone_map
+        if saved is None or saved["stamp"] != stamp:
+            saved = self._read_zones()
+        if saved is not None and saved["stamp"] == stamp:
+            self._zone_map = saved
+            return saved["zones"]
+        zones: List[Zone] = []
+        if saved is not None and saved["stamp"][0] == st.st_ino and saved["stamp"][1] < len(mm):
+            zones = [tuple(zone) for zone in saved["zones"]]  # pyright: ignore[reportAssignmentType]
+        pos = zones.pop()[0] if zones else 0
+        zones.extend(self._scan_zones(mm, pos))
+        self._zone_map = {"stamp": stamp, "zones": zones}
+        self._write_zones(stamp, zones)
+        return zones
+
+    def _scan_zones(self, mm: mmap.mmap, pos: int) -> List[Zone]:
+        """Split the log from pos into zones of config.WEIGHT_ZONE_ENTRIES entries"""
+        zones: List[Zone] = []
+        size = len(mm)
+        zone_start = pos
+        count = 0
+        first, last = date.max.toordinal(), date.min.toordinal()
+        is_weight = True
+        mm.seek(pos)
+        while pos < size:
+            line = mm.readline().strip()
+            if line:
+                if is_weight and count == config.WEIGHT_ZONE_ENTRIES:
+                    zones.append((zone_start, pos, first, last))
+                    zone_start, count = pos, 0
+                    first, last = date.max.toordinal(), date.min.toordinal()
+                if not is_weight:
+                    count += 1
+                    try:
+                        day = parse_date_ordinal(line.decode())
+                        first, last = min(first, day), max(last, day)
+                    except ValueError:
+                        pass
+                is_weight = not is_weight
+            pos = mm.tell()
+        if zone_start < size:
+            zones.append((zone_start, size, first, last))
+        return zones
+
+    def _read_zones(self) -> Optional[Dict]:
+        if self.zones_path is None:
+            return None
+        try:
+            with open(self.zones_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_zones(self, stamp: List[int], zones: List[Zone]) -> None:
+        if self.zones_path is None:
+            return
+        write_cache(self.zones_path, json.dumps({"stamp": stamp, "zones": zones}))
+
+    def append(self, weight: str, date_str: str) -> None:
+        """Append one entry to the file and the index"""
+        self._ensure_loaded()
+        prefix = "\n" if self._count else ""
+        durable_append(self.path, f"{prefix}{weight}\n{date_str}", self.fsync)
+        self._seen = file_id(self.path)
+        self._index(weight, date_str)
+        self._write_snapshot(weight, date_str)
+
+    def extend(self, entries: Iterable[Tuple[str, str]]) -> int:
+        """Append many entries in one write, skipping dates already logged"""
+        self._ensure_loaded()
+        chunks: List[str] = []
+        had_entries = bool(self._count)
+        for weight, date_str in entries:
+            if self._seen_date(date_str):
+                continue
+            self._index(weight, date_str)
+            chunks.append(f"{weight}\n{date_str}")
+        if not chunks:
+            return 0
+
+        prefix = "\n" if had_entries else ""
+        durable_append(self.path, prefix + "\n".join(chunks), self.fsync)
+        self._seen = file_id(self.path)
+        self._write_snapshot(*self._last)
+        return len(chunks)
+
+    def invalidate(self) -> None:
+        """Forget the index after the file was replaced, e.g. by a reset through a WriteLayer"""
+        self._dates = set()
+        self._days = set()
+        self._count = 0
+        self._last = ("", "")
+        self._seen = (0, 0)
+        self._loaded = False
+
+    def latest(self) -> Tuple[str, str]:
+        """Get the last (weight, date) entry without reading the whole log"""
+        if self._loaded:
+            return self._last
+
+        stamp = file_stamp(self.path)
+        if stamp is None:
+            return ("", "")
+
+        cached = self._read_snapshot()
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        entry = self._read_tail()
+        if entry[1]:
+            self._write_snapshot(*entry)
+        return entry
+
+    def _read_snapshot(self) -> Optional[Tuple[str, Tuple[str, str]]]:
+        if self.snapshot_path is None:
+            return None
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                lines = f.read().split("\n")
+        except FileNotFoundError:
+            return None
+        if len(lines) < 3:
+            return None
+        return lines[0], (lines[1], lines[2])
+
+    def _write_snapshot(self, weight: str, date_str: str) -> None:
+        if self.snapshot_path is None:
+            return
+        stamp = file_stamp(self.path)
+        if stamp is None:
+            return
+        write_cache(self.snapshot_path, f"{stamp}\n{weight}\n{date_str}")
+
+    def _read_tail(self) -> Tuple[str, str]:
+        """Read backwards from the end of the log until one full entry is found"""
+        with open(self.path, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            data = b""
+            lines: List[bytes] = []
+            while pos > 0:
+                step = min(TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+                lines = [line.strip() for line in data.split(b"\n") if line.strip()]
+                # The first line may be cut in half unless we reached the start
+                if len(lines) >= 3 or (pos == 0 and len(lines) >= 2):
+                    break
+
+        if pos == 0 and len(lines) % 2:
+            lines = lines[:-1]
+        if len(lines) < 2:
+            return ("", "")
+        return lines[-2].decode(), lines[-1].decode()
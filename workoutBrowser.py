@@ -0,0 +1,207 @@
+from collections import OrderedDict
+from rich.segment import Segment
+from textual import work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.screen import Screen
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Button, Input, Label
+from textual.containers import Vertical, Horizontal
+from user import UsrData
+import config
+
+
+class WorkoutList(ScrollView, can_focus=True):
+    """Virtualized list of saved workouts.
+
+    Only the rows in view are rendered, and a workout's lifts are read from
+    storage the first time its row is drawn. A small LRU keeps recently
+    drawn rows so scrolling back does not hit the disk again.
+    """
+
+    COMPONENT_CLASSES = {"workout-list--cursor"}
+    BINDINGS = [
+        Binding(key="down", action="cursor_down", description="Move down", show=False),
+        Binding(key="up", action="cursor_up", description="Move up", show=False),
+        Binding(key="pagedown", action="page_down", description="Page down", show=False),
+        Binding(key="pageup", action="page_up", description="Page up", show=False),
+        Binding(key="enter", action="select", description="Select workout"),
+    ]
+
+    cursor = reactive(0)
+
+    class Highlighted(Message):
+        """The cursor moved onto a workout."""
+        def __init__(self, name: str, lifts: list[str]) -> None:
+            super().__init__()
+            self.name = name
+            self.lifts = lifts
+
+    class Selected(Message):
+        """Enter was pressed on a workout."""
+        def __init__(self, name: str) -> None:
+            super().__init__()
+            self.name = name
+
+    def __init__(self, usr_info: UsrData, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.usr_info = usr_info
+        self.names: list[str] = usr_info.workouts
+        self._lifts_cache: OrderedDict[str, list[str]] = OrderedDict()
+        self.virtual_size = Size(0, len(self.names))
+
+    def set_names(self, names: list[str]) -> None:
+        """Show a different set of workouts, e.g. the result of a filter"""
+        self.names = names
+        self.virtual_size = Size(0, len(names))
+        self.scroll_to(0, 0, animate=False)
+        self.cursor = 0
+        self.refresh()
+
+    def get_lifts(self, name: str) -> list[str]:
+        """Lifts for a workout, read from storage on first use"""
+        lifts = self._lifts_cache.get(name)
+        if lifts is None:
+            lifts = self.usr_info.get_workout_lifts(name)
+            self._lifts_cache[name] = lifts
+            if len(self._lifts_cache) > config.WORKOUT_CACHE_SIZE:
+                self._lifts_cache.popitem(last=False)
+        else:
+            self._lifts_cache.move_to_end(name)
+        return lifts
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        style = self.rich_style
+        if index >= len(self.names):
+            return Strip.blank(width, style)
+
+        if index == self.cursor:
+            style = self.get_component_rich_style("workout-list--cursor")
+        name = self.names[index]
+        text = f" {name} — {', '.join(self.get_lifts(name))}"
+        return Strip([Segment(text, style)]).crop_extend(0, width, style)
+
+    def watch_cursor(self, old: int, new: int) -> None:
+        self.refresh()
+        if self.names:
+            self.scroll_to_region(Region(0, new, 1, 1), animate=False)
+            name = self.names[new]
+            self.post_message(self.Highlighted(name, self.get_lifts(name)))
+
+    def _move(self, delta: int) -> None:
+        if self.names:
+            self.cursor = max(0, min(len(self.names) - 1, self.cursor + delta))
+
+    def action_cursor_down(self) -> None:
+        self._move(1)
+
+    def action_cursor_up(self) -> None:
+        self._move(-1)
+
+    def action_page_down(self) -> None:
+        self._move(max(1, self.size.height))
+
+    def action_page_up(self) -> None:
+        self._move(-max(1, self.size.height))
+
+    def action_select(self) -> None:
+        if self.names:
+            self.post_message(self.Selected(self.names[self.cursor]))
+
+    def on_click(self, event) -> None:
+        index = self.scroll_offset.y + event.y
+        if 0 <= index < len(self.names):
+            self.cursor = index
+
+
+class WorkoutBrowser(Screen):
+    CSS_PATH = "workout_browser.tcss"
+    BINDINGS = [
+        Binding(key="escape", action="go_back", description="Back"),
+    ]
+
+    class FilterResults(Message):
+        """Posted by the filter worker once the matching workouts are known."""
+        def __init__(self, lifts: list[str], names: list[str]) -> None:
+            super().__init__()
+            self.lifts = lifts
+            self.names = names
+
+    def __init__(self, usr_info: UsrData):
+        super().__init__()
+        self.usr_info = usr_info
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="browser-container"):
+            yield Label("Saved Workouts", id="title")
+            yield Input(placeholder="Filter by lifts, comma separated (Enter to apply)", id="lift_filter")
+            yield WorkoutList(self.usr_info, id="workout_list")
+            yield Label("", id="details")
+            with Horizontal(id="button-container"):
+                yield Button("Back", variant="default", id="back")
+            yield Label("", id="status")
+
+    def on_mount(self) -> None:
+        workout_list = self.query_one(WorkoutList)
+        workout_list.focus()
+        count = len(workout_list.names)
+        if count:
+            self.query_one("#status", Label).update(f"{count} saved workouts · Enter starts one")
+            name = workout_list.names[0]
+            self._show_details(name, workout_list.get_lifts(name))
+        else:
+            self.query_one("#status", Label).update("No saved workouts yet")
+
+    def on_workout_list_highlighted(self, message: WorkoutList.Highlighted) -> None:
+        self._show_details(message.name, message.lifts)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id != "lift_filter":
+            return
+        lifts = [lift.strip() for lift in event.value.split(",") if lift.strip()]
+        self.query_one("#status", Label).update("Filtering…")
+        self._filter_worker(lifts)
+
+    @work(thread=True, exclusive=True, group="filter")
+    def _filter_worker(self, lifts: list[str]) -> None:
+        """Match workouts off the event loop, since refreshing the index stats every workout file"""
+        names = self.usr_info.find_workouts(lifts) if lifts else self.usr_info.workouts
+        self.post_message(self.FilterResults(lifts, names))
+
+    def on_workout_browser_filter_results(self, message: FilterResults) -> None:
+        lifts = message.lifts
+        workout_list = self.query_one(WorkoutList)
+        status = self.query_one("#status", Label)
+        workout_list.set_names(message.names)
+        if lifts:
+            status.update(f"{len(workout_list.names)} workouts with all of: {', '.join(lifts)}")
+        else:
+            status.update(f"{len(workout_list.names)} saved workouts · Enter starts one")
+        workout_list.focus()
+        if workout_list.names:
+            name = workout_list.names[0]
+            self._show_details(name, workout_list.get_lifts(name))
+        else:
+            self.query_one("#details", Label).update("(no matching workouts)")
+
+    def on_workout_list_selected(self, message: WorkoutList.Selected) -> None:
+        from startWorkout import StartWorkout
+        self.app.push_screen(StartWorkout(self.usr_info, message.name))
+
+    def _show_details(self, name: str, lifts: list[str]) -> None:
+        lines = "\n".join(f"• {lift}" for lift in lifts) or "(no lifts)"
+        self.query_one("#details", Label).update(f"{name}\n{lines}")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "back":
+            self.action_go_back()
+
+    def action_go_back(self) -> None:
+        self.app.pop_screen()
@@ -0,0 +1,119 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from durable import file_stamp, stat_stamp, write_cache
+
+# durable.stat_stamp of a workout file when it was indexed
+Stamp = str
+
+
+class WorkoutIndex:
+    """Lift ID -> workouts inverted index over the ``Workouts/`` directory.
+
+    The index file stores each workout's lift IDs together with the size
+    and mtime its file had when it was read. On load the postings are
+    rebuilt from that in memory. ``refresh()`` stats every workout file and
+    re-reads only the ones that were added, changed or removed outside the
+    app; call it before querying. Writes made through the app update the
+    index directly.
+    """
+
+    def __init__(self, dir_path: Path, index_path: Path,
+                 read_ids: Callable[[str], List[int]],
+                 is_pending: Optional[Callable[[str], bool]] = None) -> None:
+        self.dir_path = dir_path
+        self.index_path = index_path
+        self.read_ids = read_ids
+        # Whether a workout's file is still held by a group-commit write layer
+        self.is_pending = is_pending or (lambda name: False)
+        self._workouts: Optional[Dict[str, Tuple[Optional[Stamp], List[int]]]] = None
+        self._postings: Dict[int, Set[str]] = {}
+
+    def _load(self) -> Dict[str, Tuple[Optional[Stamp], List[int]]]:
+        if self._workouts is None:
+            self._workouts = {}
+            self._postings = {}
+            try:
+                with open(self.index_path, 'r') as f:
+                    data = json.load(f)
+            except (FileNotFoundError, ValueError):
+                data = {}
+            for name, (stamp, lift_ids) in data.get("workouts", {}).items():
+                # Older indexes kept [size, mtime_ns]; those entries are re-read once
+                self._set(name, stamp if isinstance(stamp, str) else None, lift_ids)
+        return self._workouts
+
+    def _set(self, name: str, stamp: Optional[Stamp], lift_ids: List[int]) -> None:
+        self._drop(name)
+        self._workouts[name] = (stamp, lift_ids)  # pyright: ignore[reportOptionalSubscript]
+        for lift_id in lift_ids:
+            self._postings.setdefault(lift_id, set()).add(name)
+
+    def _drop(self, name: str) -> None:
+        old = self._workouts.pop(name, None)  # pyright: ignore[reportOptionalMemberAccess]
+        if old is None:
+            return
+        for lift_id in old[1]:
+            names = self._postings.get(lift_id)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._postings[lift_id]
+
+    def _save(self) -> None:
+        data = {"workouts": {name: [stamp, lift_ids]
+                             for name, (stamp, lift_ids) in self._load().items()}}
+        write_cache(self.index_path, json.dumps(data))
+
+    def update(self, name: str, lift_ids: Iterable[int]) -> None:
+        """Record a workout the app just saved"""
+        self._load()
+        # A group-committed write may not be on disk yet; a missing stamp
+        # makes the next refresh read the file once
+        self._set(name, file_stamp(self.dir_path / (name + ".txt")), list(lift_ids))
+        self._save()
+
+    def refresh(self) -> int:
+        """Re-read workout files changed outside the app; returns how many"""
+        workouts = self._load()
+        seen: Set[str] = set()
+        changed = 0
+        with os.scandir(self.dir_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".txt") or not entry.is_file():
+                    continue
+                name = entry.name[:-4]
+                seen.add(name)
+                stamp = stat_stamp(entry.stat())
+                cached = workouts.get(name)
+                if cached is None or cached[0] != stamp:
+                    self._set(name, stamp, self.read_ids(name))
+                    changed += 1
+        # An entry without a stamp is kept while its write is still pending;
+        # after that a missing file means it was deleted
+        for name in [name for name, (stamp, _) in workouts.items()
+                     if name not in seen and (stamp is not None or not self.is_pending(name))]:
+            self._drop(name)
+            changed += 1
+        if changed:
+            self._save()
+        return changed
+
+    def containing(self, lift_id: int) -> Set[str]:
+        """Workouts that include a lift, as of the last refresh"""
+        self._load()
+        return set(self._postings.get(lift_id, ()))
+
+    def containing_all(self, lift_ids: Iterable[int]) -> List[str]:
+        """Workouts that include every one of the lifts, as of the last refresh"""
+        self._load()
+        postings = sorted((self._postings.get(lift_id, set()) for lift_id in set(lift_ids)), key=len)
+        if not postings:
+            return []
+        result = set(postings[0])
+        for names in postings[1:]:
+            result &= names
+            if not result:
+                break
+        return sorted(result)
@@ -0,0 +1,112 @@
+import sys
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Iterator, List, Optional, Tuple
+import config
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+ErrorCallback = Callable[[str], None]
+Job = Tuple[Callable[..., Any], tuple, Optional[ErrorCallback]]
+
+
+class WriteQueue:
+    """Write-behind queue that runs storage writes on one background thread.
+
+    A single worker keeps writes in the order they were made, so storage
+    never sees two writes at once. A job that raises, or returns
+    ``(False, msg)`` like the UsrData methods do, is reported through its
+    ``on_error`` callback, which is called on the worker thread.
+    """
+
+    def __init__(self) -> None:
+        # Imported here so headless users of UsrData, which never queue, start faster
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="write-behind")
+        self._batch: Optional[List[Job]] = None
+        self._last: Optional["Future"] = None
+
+    def submit(self, fn: Callable[..., Any], *args, on_error: Optional[ErrorCallback] = None) -> None:
+        """Queue fn(*args), or hold it for the enclosing batch"""
+        if self._batch is not None:
+            self._batch.append((fn, args, on_error))
+            return
+        self._last = self._executor.submit(self._run, fn, args, on_error)
+
+    @contextmanager
+    def batch(self, wrap: Callable[[], ContextManager]) -> Iterator[None]:
+        """Queue every write made in the block as one job run inside wrap()"""
+        if self._batch is not None:
+            yield
+            return
+        jobs: List[Job] = []
+        self._batch = jobs
+        try:
+            yield
+        finally:
+            self._batch = None
+            if jobs:
+                self._last = self._executor.submit(self._run_batch, jobs, wrap)
+
+    def _run_batch(self, jobs: List[Job], wrap: Callable[[], ContextManager]) -> None:
+        try:
+            with wrap():
+                for fn, args, on_error in jobs:
+                    self._run(fn, args, on_error)
+        except Exception as e:
+            # The batch's commit itself failed
+            self._report(jobs[-1][2], config.MSG_SAVE_FAILED.format(error=e))
+
+    def _run(self, fn: Callable[..., Any], args: tuple, on_error: Optional[ErrorCallback]) -> None:
+        try:
+            result = fn(*args)
+        except Exception as e:
+            result = (False, config.MSG_SAVE_FAILED.format(error=e))
+        if isinstance(result, tuple) and result and result[0] is False:
+            self._report(on_error, result[1])
+
+    def _report(self, on_error: Optional[ErrorCallback], msg: str) -> None:
+        if on_error is not None:
+            on_error(msg)
+        else:
+            print(msg, file=sys.stderr)
+
+    def flush(self) -> None:
+        """Wait until everything queued so far has been written"""
+        # One worker runs jobs in order, so the last one finishing means all have
+        last = self._last
+        if last is not None:
+            last.result()
+
+    def close(self) -> None:
+        """Write everything still queued and stop the worker"""
+        self._executor.shutdown(wait=True)
+
+
+def status_reporter(screen, selector: str = "#status") -> ErrorCallback:
+    """on_error callback that shows a failed write in a screen's status label.
+
+    Create it on the UI thread. The update is handed to the app's event
+    loop without waiting for it, so flushing the queue while the app shuts
+    down cannot deadlock. If the screen has been closed by then, the error
+    becomes a notification.
+    """
+    # Imported here so headless users of UsrData do not pay for asyncio
+    import asyncio
+    app = screen.app
+    loop = asyncio.get_running_loop()
+
+    def show(msg: str) -> None:
+        if screen.is_attached:
+            screen.query_one(selector).update(msg)
+        else:
+            app.notify(msg, severity="error")
+
+    def report(msg: str) -> None:
+        try:
+            loop.call_soon_threadsafe(show, msg)
+        except RuntimeError:
+            # The app's loop has already closed
+            print(msg, file=sys.stderr)
+
+    return report